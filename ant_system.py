@@ -1,7 +1,14 @@
 import numpy as np
-import random
-from scipy.spatial import distance
-from typing import List, Tuple
+import time
+from typing import Callable, Iterator, Tuple
+from distances import calc_distance_matrix
+from candidates import candidate_lists
+from termination import Termination, iteration_range
+from progress import make_progress, run_to_end
+from instrumentation import Instrumentation
+from initialization import open_path, initial_path_for
+from local_search import local_search, NUM_OF_CANDIDATES
+from kernels import USE_NUMBA, roulette_choice
 
 
 def ant_system(cities: np.array,
@@ -9,167 +16,416 @@ def ant_system(cities: np.array,
                num_of_tours: int,
                alpha: float,
                beta: float,
-               p: float) -> Tuple[float, list]:
+               p: float,
+               distance_matrix: np.array = None,
+               num_of_candidates: int = None,
+               termination: Termination = None,
+               callback: Callable[[dict], bool] = None,
+               use_local_search: bool = False,
+               variant: str = 'as',
+               q0: float = 0.9,
+               xi: float = 0.1,
+               instrumentation: Instrumentation = None,
+               initial_path: list = None,
+               initialization: str = 'random',
+               return_statistics: bool = False) -> tuple:
     """
     Solving Traveling Salesman Problem using Ant System Algorithm
 
     :param cities: 2D numpy array of cities
     :param k: num of ants/ cities
-    :param num_of_tours: number of iterations
+    :param num_of_tours: number of iterations (no limit if None, then termination has to be given)
     :param alpha: control parameter
     :param beta: control parameter
     :param p: pheromone evaporation coefficient
+    :param distance_matrix: precomputed distances between cities (calculated from cities if not given)
+    :param num_of_candidates: if given, ants choose next city from that number of the nearest not visited
+    cities, all cities are considered only when every candidate was visited
+    :param termination: additional stopping criteria checked after each tour
+    :param callback: function called with progress (see ant_system_iter) after finding new best path,
+    returning True stops the algorithm
+    :param use_local_search: if True path of each ant is improved with 2-opt and Or-opt local search before
+    leaving pheromone
+    :param variant: version of the algorithm. Can obtain three values: "as" (Ant System, each ant leaves
+    pheromone), "mmas" (Max-Min Ant System, only the best ant of the tour leaves pheromone, which is kept
+    between lower and upper bound) or "acs" (Ant Colony System, see q0 and xi)
+    :param q0: used only by "acs", probability of going to the best city instead of drawing it
+    :param xi: used only by "acs", part of the pheromone evaporated from the arc at the moment ant uses it
+    :param instrumentation: if given, time of each phase (construction, evaluation, local_search,
+    pheromone_update), counters of tours and evaluations and trace of the best and mean path length of each tour
+    are collected in it
+    :param initial_path: path (for example found earlier for similar instance) used as the best path found
+    before the first tour, pheromone is left on its arcs at the beginning
+    :param initialization: way of creating the first path when initial_path is not given. Can obtain values:
+    "random", "nearest_neighbour", "greedy", "space_filling_curve" or "christofides" (see initialization.py)
+    :param return_statistics: if True summary of instrumentation (created if not given) is returned
+    together with the result
     :return: best score (as an float) and best route (indexes of the cities) found
+    (and summary of instrumentation if return_statistics is True)
     """
+    if return_statistics and instrumentation is None:
+        instrumentation = Instrumentation()
+    return run_to_end(ant_system_iter(cities, k, num_of_tours, alpha, beta, p, distance_matrix,
+                                      num_of_candidates, termination, use_local_search, variant, q0, xi,
+                                      instrumentation, initial_path, initialization),
+                      callback, instrumentation if return_statistics else None)
+
+
+def ant_system_iter(cities: np.array,
+                    k: int,
+                    num_of_tours: int,
+                    alpha: float,
+                    beta: float,
+                    p: float,
+                    distance_matrix: np.array = None,
+                    num_of_candidates: int = None,
+                    termination: Termination = None,
+                    use_local_search: bool = False,
+                    variant: str = 'as',
+                    q0: float = 0.9,
+                    xi: float = 0.1,
+                    instrumentation: Instrumentation = None,
+                    initial_path: list = None,
+                    initialization: str = 'random') -> Iterator[dict]:
+    """
+    Ant System Algorithm yielding progress each time new best path is found, parameters are the same as in
+    ant_system. Search can be cancelled at any moment by closing the generator.
+
+    :return: generator of dictionaries with best_score, best_path, iteration (number of tours),
+    evaluations (number of paths) and elapsed (seconds from the start)
+    """
+    start_time = time.perf_counter()
+    # time limit counts also preparation (distances, candidate lists, initial paths)
+    if termination is not None:
+        termination.start()
+    if variant not in ('as', 'mmas', 'acs'):
+        raise ValueError(f"Unknown variant '{variant}', use one of: as, mmas, acs")
+    if variant == 'mmas' and p >= 1:
+        raise ValueError('Max-Min Ant System needs pheromone evaporation (p < 1)')
     # number of cities
     num_of_cities = cities.shape[0]
 
     # calculate start level of the pheromone
-    array_dist_between_cities = calc_distance_array(cities)
+    if distance_matrix is None:
+        distance_matrix = calc_distance_matrix(cities)
+    if instrumentation is not None:
+        instrumentation.watch_cache('distance_cache', distance_matrix)
+    # pheromone is kept for each arc, so distance provider is turned into the whole matrix
+    array_dist_between_cities = np.asarray(distance_matrix)
     max_dist = np.nanmax(array_dist_between_cities, axis=1)
     tau_0 = 1 / max_dist
 
-    # create dictionary of ants which will move through the cities
-    list_of_ants = create_ants(k, num_of_cities)
+    # start point of each ant
+    array_start_points = np.random.randint(0, num_of_cities, size=k)
+
+    # visibility of each city (inverse of the distance) raised to the power of beta does not change
+    with np.errstate(divide='ignore'):
+        array_visibility = (1 / array_dist_between_cities) ** beta
+    np.fill_diagonal(array_visibility, 0)
 
-    # initialization of decision table
-    array_base_pheromone = np.zeros((num_of_cities, num_of_cities))
-    array_pheromone = np.copy(array_base_pheromone)
-    for i in range(num_of_cities):
-        for j in range(num_of_cities):
-            if i == j:
-                array_base_pheromone[i][j] = np.nan
-            else:
-                array_base_pheromone[i][j] = tau_0[j]
+    # lists of the nearest cities used to limit choice of the next city
+    array_candidates = None
+    if num_of_candidates is not None:
+        array_candidates = candidate_lists(cities, num_of_candidates)
+    array_local_search_candidates = None
+    if use_local_search:
+        array_local_search_candidates = array_candidates if array_candidates is not None else \
+            candidate_lists(cities, NUM_OF_CANDIDATES)
 
     # in the first tour choose paths randomly
-    for ant in list_of_ants:
-        for i in range(num_of_cities - 1):
-            # draw city number
-            city_idx = random.choice(ant['cities_left'])
+    array_paths = random_tours(array_start_points, num_of_cities)
+    array_dist_traveled = calc_paths_dist(array_paths, array_dist_between_cities)
+    best_dist, best_path = select_best(array_paths, array_dist_traveled)
+    num_of_evaluations = k
+    # path built by construction heuristic is treated like the initial path
+    initial_path = initial_path_for(cities, initialization, initial_path)
+    array_initial_path = None
+    if initial_path is not None:
+        initial_path = open_path(initial_path, num_of_cities)
+        array_initial_path = np.array([initial_path + initial_path[:1]])
+        initial_dist = float(calc_paths_dist(array_initial_path, array_dist_between_cities)[0])
+        num_of_evaluations += 1
+        if initial_dist < best_dist:
+            best_dist, best_path = initial_dist, array_initial_path[0].tolist()
+    yield make_progress(best_dist, best_path, 0, num_of_evaluations, start_time)
 
-            # save information about the traveled route
-            ant['cities_left'].remove(city_idx)
-            ant['dist_traveled'] += distance.euclidean(cities[ant['path'][-1]], cities[city_idx])
-            ant['path'].append(city_idx)
+    # calculate level of pheromone between cities
+    if variant == 'as':
+        # initialization of decision table and pheromone left in the first tour
+        array_pheromone = p * np.tile(tau_0, (num_of_cities, 1))
+        deposit_pheromone(array_pheromone, array_paths, 1 / array_dist_traveled)
+    elif variant == 'mmas':
+        # pheromone starts at the upper bound
+        tau_max, tau_min = mmas_bounds(best_dist, p, num_of_cities)
+        array_pheromone = np.full((num_of_cities, num_of_cities), tau_max)
+    else:
+        # pheromone starts at level also used by local update
+        tau_acs = 1 / (num_of_cities * best_dist)
+        array_pheromone = np.full((num_of_cities, num_of_cities), tau_acs)
+    # initial path gets pheromone as if it was the best path found so far
+    if array_initial_path is not None:
+        if variant == 'as':
+            deposit_pheromone(array_pheromone, array_initial_path, np.array([k / initial_dist]))
+        elif variant == 'mmas':
+            array_pheromone[:] = tau_min
+            array_pheromone[array_initial_path[0, :-1], array_initial_path[0, 1:]] = tau_max
+            array_pheromone[array_initial_path[0, 1:], array_initial_path[0, :-1]] = tau_max
+        else:
+            acs_global_update(array_pheromone, array_initial_path, p, initial_dist)
+    # ant never goes to the city it is in
+    np.fill_diagonal(array_pheromone, 0)
+
+    if termination is not None:
+        termination.update(best_dist, k)
 
-        # after visiting each city return to the starting place
-        ant['dist_traveled'] += distance.euclidean(cities[ant['path'][-1]], cities[ant['start_point']])
-        ant['path'].append(ant['start_point'])
+    # main loop of the algorithm
+    for tour in iteration_range(num_of_tours, termination):
+        if termination is not None and termination.reason is not None:
+            break
+        if instrumentation is not None:
+            instrumentation.start_laps()
+        # probability of choosing each arc is proportional to tau^alpha * eta^beta
+        array_weights = array_pheromone ** alpha * array_visibility
 
-        # sum up pheromone on each arc from this tour
-        for first_city_idx, second_city_idx in \
-                zip(ant['path'][:-1], ant['path'][1:]):
-            array_pheromone[first_city_idx][second_city_idx] += 1 / ant['dist_traveled']
+        # all ants are moving through the cities at the same time
+        if variant == 'acs':
+            def local_update(array_from: np.array, array_to: np.array) -> None:
+                acs_local_update(array_pheromone, array_weights, array_visibility, alpha, xi, tau_acs,
+                                 array_from, array_to)
+            array_paths = construct_tours(array_weights, array_start_points, array_candidates, q0, local_update)
+        else:
+            array_paths = construct_tours(array_weights, array_start_points, array_candidates)
+        if instrumentation is not None:
+            instrumentation.lap('construction')
+        array_dist_traveled = calc_paths_dist(array_paths, array_dist_between_cities)
+        if instrumentation is not None:
+            instrumentation.lap('evaluation')
+        if use_local_search:
+            improve_paths(array_paths, array_dist_traveled, array_dist_between_cities,
+                          array_local_search_candidates)
+            if instrumentation is not None:
+                instrumentation.lap('local_search')
+        num_of_evaluations += k
+        tour_best_dist, tour_best_path = select_best(array_paths, array_dist_traveled)
+        if instrumentation is not None:
+            instrumentation.count('tours')
+            instrumentation.count('evaluations', k)
+            instrumentation.trace(tour + 1, tour_best=float(tour_best_dist),
+                                  tour_mean=float(array_dist_traveled.mean()),
+                                  best=float(min(best_dist, tour_best_dist)))
+        if tour_best_dist < best_dist:
+            best_dist, best_path = tour_best_dist, tour_best_path
+            if instrumentation is not None:
+                instrumentation.count('improvements')
+            yield make_progress(best_dist, best_path, tour + 1, num_of_evaluations, start_time)
+            # time spent by the consumer of the progress is not measured
+            if instrumentation is not None:
+                instrumentation.start_laps()
 
-    # calculate level of pheromone between cities
-    array_whole_pheromone = p * array_base_pheromone + array_pheromone
+        # evaporation and pheromone left on arcs used in this tour
+        if variant == 'as':
+            array_pheromone *= p
+            deposit_pheromone(array_pheromone, array_paths, 1 / array_dist_traveled)
+        elif variant == 'mmas':
+            array_pheromone *= p
+            best_ant_idx = np.argmin(array_dist_traveled)
+            deposit_pheromone(array_pheromone, array_paths[best_ant_idx:best_ant_idx + 1],
+                              1 / array_dist_traveled[best_ant_idx:best_ant_idx + 1])
+            tau_max, tau_min = mmas_bounds(best_dist, p, num_of_cities)
+            np.clip(array_pheromone, tau_min, tau_max, out=array_pheromone)
+        else:
+            acs_global_update(array_pheromone, np.array([best_path]), p, best_dist)
+        np.fill_diagonal(array_pheromone, 0)
+        if instrumentation is not None:
+            instrumentation.lap('pheromone_update')
 
-    # main loop of the algorithm
-    for tour in range(num_of_tours):
-        # list_of_ants = create_ants(k, num_of_cities)
-        list_of_ants = restart_ants(list_of_ants, num_of_cities)
-
-        # for each ant
-        for ant in list_of_ants:
-            for i in range(num_of_cities - 1):
-                actual_city_idx = ant['path'][-1]
-                semi_decision_table = np.zeros(shape=(num_of_cities, 1))
-                decision_table = np.zeros_like(semi_decision_table)
-
-                for city_idx in range(num_of_cities):
-                    # avoid same and visited cities
-                    if city_idx == actual_city_idx or city_idx not in ant['cities_left']:
-                        semi_decision_table[city_idx] = np.nan
-                    else:
-                        semi_decision_table[city_idx] = (array_whole_pheromone[actual_city_idx][city_idx] **
-                                                         alpha) * ((1 / array_dist_between_cities[actual_city_idx][
-                                                         city_idx]) ** beta)
-
-                # using path used by ant update decision table
-                for j in range(num_of_cities):
-                    decision_table[j] = semi_decision_table[j] / \
-                                        np.nansum(semi_decision_table)
-                # base on decision table calculate probabilities of choosing city
-                probabilities_table = np.zeros_like(decision_table)
-                for k in range(num_of_cities):
-                    if not np.isnan(probabilities_table[k]):
-                        probabilities_table[k] = decision_table[k] / np.nansum(decision_table)
-
-                # select next city to go from not visited yet using probabilities and uniform distribution
-                city_to_go_idx = where_to_go(probabilities_table)
-
-                # save information about the traveled route
-                ant['cities_left'].remove(city_to_go_idx)
-                ant['dist_traveled'] += distance.euclidean(cities[ant['path'][-1]], cities[city_to_go_idx])
-                ant['path'].append(city_to_go_idx)
-
-            # after visiting each city return to the starting place
-            ant['dist_traveled'] += distance.euclidean(cities[ant['path'][-1]], cities[ant['start_point']])
-            ant['path'].append(ant['start_point'])
-
-            # sum up pheromone on each arc from this tour
-            for first_city_idx, second_city_idx in \
-                    zip(ant['path'][:-1], ant['path'][1:]):
-                array_pheromone[first_city_idx][second_city_idx] += 1 / ant['dist_traveled']
-
-        array_whole_pheromone = p * array_whole_pheromone + array_pheromone
-
-    list_of_ants = sorted(list_of_ants, key=lambda ant: ant['dist_traveled'])
-    best_dist = list_of_ants[0]['dist_traveled']
-    best_path = list_of_ants[0]['path']
-    return best_dist, best_path
-
-
-def create_ants(num_of_ants: int, num_of_cities: int) -> List[dict]:
-    list_of_ants = []
-    for i in range(num_of_ants):
-        rand_start_point = np.random.randint(0, num_of_cities - 1)
-        start_dist = 0
-        ant = {"start_point": rand_start_point, "dist_traveled": start_dist,
-               "cities_left": list(range(num_of_cities)), "path": [rand_start_point]}
-        ant['cities_left'].remove(ant['start_point'])
-        list_of_ants.append(ant)
-    return list_of_ants
-
-
-def restart_ants(list_of_ants: List[dict], num_of_cities: int) -> List[dict]:
-    for ant in list_of_ants:
-        ant['dist_traveled'] = 0
-        ant["cities_left"] = list(range(num_of_cities))
-        ant['cities_left'].remove(ant['start_point'])
-        ant['path'] = [ant['start_point']]
-    return list_of_ants
-
-
-def where_to_go(probabilities_table: np.array) -> int:
-    rand_num = np.random.uniform(0, 1)
-    sum_of_probabilities = 0
-    index_of_city = -1
-    for idx, val in enumerate(probabilities_table.reshape((-1,))):
-        if not np.isnan(val):
-            sum_of_probabilities += val
-        if sum_of_probabilities >= rand_num:
-            index_of_city = idx
+        if termination is not None and termination.update(best_dist, k):
             break
-    if index_of_city == -1:
-        for i in range(probabilities_table.shape[0]):
-            if np.isnan(probabilities_table[-1 - i]):
-                continue
-            else:
-                index_of_city = i
-    return index_of_city
 
 
-def calc_distance_array(cities: np.array) -> np.array:
-    num_of_cities = cities.shape[0]
-    array_dist_between_cities = np.zeros((num_of_cities, num_of_cities))
-    for i in range(num_of_cities):
-        for j in range(num_of_cities):
-            if i == j:
-                array_dist_between_cities[i][j] = np.nan
-            else:
-                city_dist = distance.euclidean(cities[i], cities[j])
-                array_dist_between_cities[i][j] = city_dist
-                array_dist_between_cities[j][i] = city_dist
-    return array_dist_between_cities
+def random_tours(array_start_points: np.array, num_of_cities: int) -> np.array:
+    # sorting random keys gives random permutation, start point gets the smallest key to be the first
+    array_keys = np.random.uniform(0, 1, size=(array_start_points.shape[0], num_of_cities))
+    array_keys[np.arange(array_start_points.shape[0]), array_start_points] = -1
+    array_paths = np.argsort(array_keys, axis=1)
+    # after visiting each city return to the starting place
+    return np.hstack((array_paths, array_paths[:, :1]))
+
+
+def construct_tours(array_weights: np.array,
+                    array_start_points: np.array,
+                    array_candidates: np.array = None,
+                    q0: float = 0,
+                    local_update: Callable[[np.array, np.array], None] = None) -> np.array:
+    """
+    Move all ants through the cities choosing each next city with the roulette wheel
+
+    :param array_weights: 2D numpy array of not normalized probabilities of going from i-th to j-th city
+    :param array_start_points: 1D numpy array with start city of each ant
+    :param array_candidates: 2D numpy array with nearest neighbours of each city, if given next city is
+    chosen only from not visited neighbours (or from all cities when each neighbour was visited)
+    :param q0: probability of going to the city of the highest weight instead of drawing it
+    :param local_update: function called after each step with arrays of cities ants left and went to
+    :return: 2D numpy array of paths (one row for each ant, with return to the start point)
+    """
+    num_of_ants = array_start_points.shape[0]
+    num_of_cities = array_weights.shape[0]
+    array_ants_idx = np.arange(num_of_ants)
+
+    array_paths = np.empty((num_of_ants, num_of_cities + 1), dtype=np.int64)
+    array_paths[:, 0] = array_start_points
+    array_visited = np.zeros((num_of_ants, num_of_cities), dtype=bool)
+    array_visited[array_ants_idx, array_start_points] = True
+
+    for step in range(1, num_of_cities):
+        array_actual_cities = array_paths[:, step - 1]
+        if array_candidates is None:
+            array_paths[:, step] = choose_from_all(array_weights, array_actual_cities, array_visited, q0)
+        else:
+            array_paths[:, step] = choose_from_candidates(array_weights, array_actual_cities,
+                                                          array_visited, array_candidates, q0)
+        array_visited[array_ants_idx, array_paths[:, step]] = True
+        if local_update is not None:
+            local_update(array_actual_cities, array_paths[:, step])
+
+    # after visiting each city return to the starting place
+    array_paths[:, -1] = array_start_points
+    if local_update is not None:
+        local_update(array_paths[:, -2], array_paths[:, -1])
+    return array_paths
+
+
+def choose_from_all(array_weights: np.array,
+                    array_actual_cities: np.array,
+                    array_visited: np.array,
+                    q0: float = 0) -> np.array:
+    # avoid visited cities
+    array_step_weights = array_weights[array_actual_cities]
+    array_step_weights[array_visited] = 0
+    return where_to_go(array_step_weights, array_visited, q0)
+
+
+def choose_from_candidates(array_weights: np.array,
+                           array_actual_cities: np.array,
+                           array_visited: np.array,
+                           array_candidates: np.array,
+                           q0: float = 0) -> np.array:
+    array_ants_idx = np.arange(array_actual_cities.shape[0])
+    # weights only of the neighbours of actual cities, avoid visited ones
+    array_step_candidates = array_candidates[array_actual_cities]
+    array_candidates_visited = array_visited[array_ants_idx[:, None], array_step_candidates]
+    array_step_weights = array_weights[array_actual_cities[:, None], array_step_candidates]
+    array_step_weights[array_candidates_visited] = 0
+
+    array_cities = np.empty_like(array_actual_cities)
+    # ants with at least one not visited neighbour
+    array_open = ~array_candidates_visited.all(axis=1)
+    if array_open.any():
+        array_choice = where_to_go(array_step_weights[array_open], array_candidates_visited[array_open], q0)
+        array_cities[array_open] = array_step_candidates[array_open, array_choice]
+    # other ants choose from all cities
+    if not array_open.all():
+        array_cities[~array_open] = choose_from_all(array_weights, array_actual_cities[~array_open],
+                                                    array_visited[~array_open], q0)
+    return array_cities
+
+
+def where_to_go(array_step_weights: np.array, array_visited: np.array, q0: float = 0) -> np.array:
+    num_of_ants, num_of_cities = array_step_weights.shape
+    array_ants_idx = np.arange(num_of_ants)
+
+    # when all weights underflow to zero choose uniformly from not visited cities
+    array_sum = array_step_weights.sum(axis=1)
+    array_no_weights = ~(array_sum > 0)
+    if array_no_weights.any():
+        array_step_weights[array_no_weights] = ~array_visited[array_no_weights]
+        array_sum[array_no_weights] = array_step_weights[array_no_weights].sum(axis=1)
+
+    # compiled kernel draws the same random numbers and goes through each row instead of the whole array
+    if USE_NUMBA and array_step_weights.dtype == np.float64:
+        array_rand = np.random.uniform(0, 1, size=num_of_ants)
+        array_exploit_rand = np.random.uniform(0, 1, size=num_of_ants) if q0 > 0 else array_rand
+        return roulette_choice(array_step_weights, array_visited, array_sum, array_rand, array_exploit_rand, q0)
+
+    # cumulative probabilities of each row are shifted by the row number, so one sorted array
+    # is searched for all ants at once
+    array_cumulative = np.cumsum(array_step_weights, axis=1) / array_sum[:, None]
+    array_cumulative += array_ants_idx[:, None]
+    array_rand = np.random.uniform(0, 1, size=num_of_ants) + array_ants_idx
+    array_cities = np.searchsorted(array_cumulative.ravel(), array_rand, side='right') - \
+        array_ants_idx * num_of_cities
+
+    # rounding errors could point to the visited city, then the most probable one is chosen
+    array_cities = np.minimum(array_cities, num_of_cities - 1)
+    array_wrong = array_visited[array_ants_idx, array_cities]
+    if array_wrong.any():
+        array_cities[array_wrong] = np.argmax(array_step_weights[array_wrong], axis=1)
+
+    # exploitation: some ants go to the city of the highest weight
+    if q0 > 0:
+        array_exploit = np.random.uniform(0, 1, size=num_of_ants) < q0
+        array_cities[array_exploit] = np.argmax(array_step_weights[array_exploit], axis=1)
+    return array_cities
+
+
+def calc_paths_dist(array_paths: np.array, array_dist_between_cities: np.array) -> np.array:
+    return array_dist_between_cities[array_paths[:, :-1], array_paths[:, 1:]].sum(axis=1)
+
+
+def select_best(array_paths: np.array, array_dist_traveled: np.array) -> Tuple[float, list]:
+    best_idx = np.argmin(array_dist_traveled)
+    return float(array_dist_traveled[best_idx]), array_paths[best_idx].tolist()
+
+
+def improve_paths(array_paths: np.array,
+                  array_dist_traveled: np.array,
+                  array_dist_between_cities: np.array,
+                  array_candidates: np.array) -> None:
+    # paths and their distances are replaced in place by the locally optimal ones
+    for ant_idx, path in enumerate(array_paths):
+        array_dist_traveled[ant_idx], improved_path = local_search(path, array_dist_between_cities,
+                                                                   array_candidates)
+        array_paths[ant_idx] = improved_path
+
+
+def deposit_pheromone(array_pheromone: np.array, array_paths: np.array, array_amounts: np.array) -> None:
+    # arcs of all paths are collected into index arrays, np.add.at sums amounts of arcs used by many ants,
+    # pheromone is symmetric, so it is left in both directions
+    array_from = array_paths[:, :-1].ravel()
+    array_to = array_paths[:, 1:].ravel()
+    array_deposit = np.repeat(array_amounts, array_paths.shape[1] - 1)
+    np.add.at(array_pheromone, (array_from, array_to), array_deposit)
+    np.add.at(array_pheromone, (array_to, array_from), array_deposit)
+
+
+def mmas_bounds(best_dist: float, p: float, num_of_cities: int, p_best: float = 0.05) -> Tuple[float, float]:
+    # upper bound is the limit of pheromone left by the best path, lower bound gives probability p_best
+    # of building the best path when pheromone converged
+    tau_max = 1 / ((1 - p) * best_dist)
+    p_root = p_best ** (1 / num_of_cities)
+    tau_min = tau_max * (1 - p_root) / (max(num_of_cities / 2 - 1, 1) * p_root)
+    return tau_max, min(tau_min, tau_max)
+
+
+def acs_local_update(array_pheromone: np.array,
+                     array_weights: np.array,
+                     array_visibility: np.array,
+                     alpha: float,
+                     xi: float,
+                     tau_0: float,
+                     array_from: np.array,
+                     array_to: np.array) -> None:
+    # ants evaporate part of pheromone from used arcs, which makes other arcs more probable for next ants
+    for array_i, array_j in ((array_from, array_to), (array_to, array_from)):
+        array_pheromone[array_i, array_j] = (1 - xi) * array_pheromone[array_i, array_j] + xi * tau_0
+        array_weights[array_i, array_j] = array_pheromone[array_i, array_j] ** alpha * \
+            array_visibility[array_i, array_j]
+
+
+def acs_global_update(array_pheromone: np.array, array_best_paths: np.array, p: float, best_dist: float) -> None:
+    # only arcs of the best path found so far evaporate and get new pheromone
+    array_from = array_best_paths[:, :-1].ravel()
+    array_to = array_best_paths[:, 1:].ravel()
+    for array_i, array_j in ((array_from, array_to), (array_to, array_from)):
+        array_pheromone[array_i, array_j] = p * array_pheromone[array_i, array_j] + (1 - p) / best_dist
+
@@ -0,0 +1,246 @@
+import argparse
+import cProfile
+import csv
+import itertools
+import json
+import os
+import time
+import tracemalloc
+import numpy as np
+from typing import Dict, List, Tuple
+from ant_system import ant_system_iter
+from genetic_algorithm import genetic_algorithm_iter
+from simulated_annealing import simulated_annealing_iter, parallel_tempering_iter
+from distances import calc_distance_matrix
+from instances import load_instance
+from termination import Termination
+from instrumentation import Instrumentation
+from seeding import spawn_seeds, seed_generators
+
+# algorithms yielding progress, they are run with termination criteria counting evaluations
+DICT_ITERATORS = {'Ant system': ant_system_iter,
+                  'Genetic algorithm': genetic_algorithm_iter,
+                  'Simulated annealing': simulated_annealing_iter,
+                  'Parallel tempering': parallel_tempering_iter}
+
+# columns of the summary written to the CSV file
+LIST_SUMMARY_COLUMNS = ['instance', 'num_of_cities', 'configuration', 'algorithm', 'runs', 'best_score',
+                        'mean_score', 'std_score', 'mean_time', 'std_time', 'target_score', 'target_reached',
+                        'mean_time_to_target', 'mean_evaluations', 'evaluations_per_second', 'peak_memory_mb']
+
+
+def run_benchmark(list_instances: list,
+                  dict_configurations: Dict[str, Tuple[str, dict]],
+                  num_of_runs: int,
+                  dict_targets: dict = None,
+                  time_limit: float = None,
+                  base_seed: int = 0,
+                  output_dir: str = None,
+                  profile: bool = False,
+                  measure_memory: bool = True,
+                  cache_dir: str = None,
+                  instrument: bool = False,
+                  trace_every: int = 100,
+                  warm_up: bool = True) -> List[dict]:
+    """
+    Run each configuration of the algorithms many times on each instance and summarize the results
+
+    :param list_instances: instances to solve, integer gives random instance with that number of cities,
+    string is a path to the file read by instances.load_instance
+    :param dict_configurations: configuration name and tuple of the algorithm name (key of DICT_ITERATORS)
+    and dictionary of its parameters (without cities and distance matrix)
+    :param num_of_runs: number of runs of each configuration on each instance
+    :param dict_targets: instance name and score, time of reaching it is measured (for example optimal score)
+    :param time_limit: maximum working time of one run in seconds
+    :param base_seed: seed from which independent seed of each run is derived
+    :param output_dir: directory for results.json, results.csv and profiles (results are not saved if not given)
+    :param profile: if True one more run of each configuration is made with cProfile, which saves its statistics
+    to output_dir/profiles
+    :param measure_memory: if True one more run of each configuration is made with tracemalloc to find its
+    peak memory (timed runs are not slowed down by tracing)
+    :param cache_dir: directory with cache of instances read from files
+    :param instrument: if True summary of instrumentation.Instrumentation (phase timers, counters and trace)
+    is added to the results of each run
+    :param trace_every: number of iterations between records of the trace of instrumented runs
+    :param warm_up: if True each configuration is run once more (not timed) before its first timed runs,
+    so compilation of kernels (see kernels.py) and filling caches are not measured
+    :return: list of records with summary and results of each run for each instance and configuration
+    """
+    dict_targets = {} if dict_targets is None else dict_targets
+    list_records = []
+    set_warmed_up = set()
+    for instance in list_instances:
+        instance_name, cities, distance_matrix = prepare_instance(instance, base_seed, cache_dir)
+        target_score = dict_targets.get(instance_name)
+        for configuration_name, (algorithm_name, dict_parameters) in dict_configurations.items():
+            if algorithm_name not in DICT_ITERATORS:
+                raise ValueError(f"Unknown algorithm '{algorithm_name}', use one of: {', '.join(DICT_ITERATORS)}")
+            list_seeds = spawn_seeds(base_seed, num_of_runs)
+            if warm_up and configuration_name not in set_warmed_up:
+                run_once(algorithm_name, dict_parameters, cities, distance_matrix, list_seeds[0], None, time_limit)
+                set_warmed_up.add(configuration_name)
+            list_runs = [run_once(algorithm_name, dict_parameters, cities, distance_matrix, seed, target_score,
+                                  time_limit, Instrumentation(trace_every) if instrument else None)
+                         for seed in list_seeds]
+
+            peak_memory = None
+            if measure_memory:
+                tracemalloc.start()
+                run_once(algorithm_name, dict_parameters, cities, distance_matrix, list_seeds[0], None, time_limit)
+                peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            if profile and output_dir is not None:
+                profile_name = file_name(f'{instance_name}-{configuration_name}') + '.prof'
+                profile_path = os.path.join(output_dir, 'profiles', profile_name)
+                os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+                profiler = cProfile.Profile()
+                profiler.runcall(run_once, algorithm_name, dict_parameters, cities, distance_matrix, list_seeds[0],
+                                 None, time_limit)
+                profiler.dump_stats(profile_path)
+
+            record = summarize_runs(list_runs, target_score, peak_memory)
+            record.update({'instance': instance_name, 'num_of_cities': int(cities.shape[0]),
+                           'configuration': configuration_name, 'algorithm': algorithm_name,
+                           'parameters': dict_parameters, 'runs_results': list_runs})
+            list_records.append(record)
+
+    if output_dir is not None:
+        save_results(list_records, output_dir)
+    return list_records
+
+
+def prepare_instance(instance, base_seed: int, cache_dir: str = None) -> Tuple[str, np.array, np.array]:
+    # random instances are generated from the seed and their size, so they are the same in each benchmark
+    if isinstance(instance, (int, np.integer)):
+        cities = np.random.default_rng([base_seed, int(instance)]).uniform(0, 1000, size=(int(instance), 2))
+        return f'random_{instance}', cities, calc_distance_matrix(cities)
+    cities, distance_matrix = load_instance(instance, cache_dir)
+    return os.path.splitext(os.path.basename(instance))[0], cities, distance_matrix
+
+
+def run_once(algorithm_name: str,
+             dict_parameters: dict,
+             cities: np.array,
+             distance_matrix: np.array,
+             seed: int,
+             target_score: float = None,
+             time_limit: float = None,
+             instrumentation: Instrumentation = None) -> dict:
+    # each run has its own random numbers stream, progress of the algorithm is used to find time to target
+    seed_generators(seed)
+    termination = Termination(time_limit=time_limit)
+    time_to_target = None
+    start = time.perf_counter()
+    progress = None
+    if instrumentation is not None:
+        dict_parameters = {**dict_parameters, 'instrumentation': instrumentation}
+    for progress in DICT_ITERATORS[algorithm_name](cities, distance_matrix=distance_matrix,
+                                                   termination=termination, **dict_parameters):
+        if time_to_target is None and target_score is not None and progress['best_score'] <= target_score:
+            time_to_target = time.perf_counter() - start
+    run_time = time.perf_counter() - start
+    dict_run = {'seed': seed, 'best_score': progress['best_score'], 'time': run_time,
+                'time_to_target': time_to_target, 'evaluations': termination.evaluations,
+                'iterations': termination.iterations}
+    if instrumentation is not None:
+        dict_run['instrumentation'] = instrumentation.summary()
+    return dict_run
+
+
+def summarize_runs(list_runs: List[dict], target_score: float = None, peak_memory: int = None) -> dict:
+    array_scores = np.array([run['best_score'] for run in list_runs])
+    array_times = np.array([run['time'] for run in list_runs])
+    array_evaluations = np.array([run['evaluations'] for run in list_runs])
+    list_times_to_target = [run['time_to_target'] for run in list_runs if run['time_to_target'] is not None]
+    return {'runs': len(list_runs),
+            'best_score': float(array_scores.min()),
+            'mean_score': float(array_scores.mean()),
+            'std_score': float(array_scores.std()),
+            'mean_time': float(array_times.mean()),
+            'std_time': float(array_times.std()),
+            'target_score': target_score,
+            'target_reached': len(list_times_to_target) if target_score is not None else None,
+            'mean_time_to_target': float(np.mean(list_times_to_target)) if list_times_to_target else None,
+            'mean_evaluations': float(array_evaluations.mean()),
+            'evaluations_per_second': float(array_evaluations.sum() / array_times.sum()),
+            'peak_memory_mb': peak_memory / 2 ** 20 if peak_memory is not None else None}
+
+
+def save_results(list_records: List[dict], output_dir: str) -> None:
+    """
+    Save records of the benchmark: all data to results.json and summary of each configuration to results.csv
+
+    :param list_records: records returned by run_benchmark
+    :param output_dir: directory for the files
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'results.json'), 'w') as f:
+        json.dump(list_records, f, indent=2)
+    with open(os.path.join(output_dir, 'results.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=LIST_SUMMARY_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(list_records)
+
+
+def load_results(output_dir: str) -> List[dict]:
+    with open(os.path.join(output_dir, 'results.json')) as f:
+        return json.load(f)
+
+
+def parameter_grid(algorithm_name: str, dict_values: Dict[str, list], dict_fixed: dict = None) -> dict:
+    """
+    Create configurations of the algorithm for each combination of parameter values
+
+    :param algorithm_name: algorithm name (key of DICT_ITERATORS)
+    :param dict_values: parameter name and list of its values
+    :param dict_fixed: parameters with the same value in each configuration
+    :return: configurations in the format used by run_benchmark
+    """
+    dict_fixed = {} if dict_fixed is None else dict_fixed
+    dict_configurations = {}
+    for values in itertools.product(*dict_values.values()):
+        dict_swept = dict(zip(dict_values, values))
+        description = ', '.join(f'{name}={value}' for name, value in dict_swept.items())
+        dict_configurations[f'{algorithm_name} ({description})'] = (algorithm_name, {**dict_fixed, **dict_swept})
+    return dict_configurations
+
+
+def file_name(name: str) -> str:
+    # keep only characters safe in file names
+    return ''.join(char if char.isalnum() or char in '-_.' else '_' for char in name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the algorithms solving Traveling Salesman Problem')
+    parser.add_argument('--instances', nargs='+', default=['50', '100', '200'],
+                        help='numbers of cities of random instances or paths to the instance files')
+    parser.add_argument('--runs', type=int, default=5, help='number of runs of each configuration')
+    parser.add_argument('--time-limit', type=float, default=None, help='maximum time of one run in seconds')
+    parser.add_argument('--seed', type=int, default=0, help='base seed of the runs')
+    parser.add_argument('--output', default='benchmark_results', help='directory for the results')
+    parser.add_argument('--profile', action='store_true', help='save cProfile statistics of each configuration')
+    parser.add_argument('--no-memory', action='store_true', help='do not measure peak memory')
+    parser.add_argument('--no-warm-up', action='store_true', help='do not make untimed run before timed ones')
+    parser.add_argument('--instrument', action='store_true', help='save phase timers, counters and trace of runs')
+    args = parser.parse_args()
+
+    list_instances = [int(instance) if instance.isdigit() else instance for instance in args.instances]
+    dict_configurations = {}
+    dict_configurations.update(parameter_grid('Ant system', {'variant': ['as', 'mmas', 'acs']},
+                                              {'k': 20, 'num_of_tours': 100, 'alpha': 1, 'beta': 5, 'p': 0.5,
+                                               'num_of_candidates': 15}))
+    dict_configurations.update(parameter_grid('Genetic algorithm', {'selection': ['roulette_wheel', 'tournament'],
+                                                                    'crossover': ['cx', 'ox']},
+                                              {'population_size': 100, 'num_of_iter': 300, 'n': 0.8,
+                                               'mutation_probability': 0.2}))
+    dict_configurations.update(parameter_grid('Simulated annealing', {'move': ['swap', '2-opt', 'or-opt']},
+                                              {'initial_temperature': 100, 'minimum_temperature': 0.01,
+                                               'alpha': 0.9995, 'scheduling': 'exponential',
+                                               'delta_evaluation': True}))
+    run_benchmark(list_instances, dict_configurations, args.runs, time_limit=args.time_limit, base_seed=args.seed,
+                  output_dir=args.output, profile=args.profile, measure_memory=not args.no_memory,
+                  cache_dir=os.path.join('Data', 'cache'), instrument=args.instrument, warm_up=not args.no_warm_up)
+
+
+if __name__ == '__main__':
+    main()
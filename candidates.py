@@ -0,0 +1,22 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def candidate_lists(cities: np.array, num_of_candidates: int) -> np.array:
+    """
+    Find nearest neighbours of each city using KD-tree
+
+    :param cities: 2D numpy array of cities
+    :param num_of_candidates: number of nearest neighbours kept for each city
+    :return: 2D numpy array with indexes of the neighbours of each city, sorted from the nearest one
+    """
+    num_of_cities = cities.shape[0]
+    num_of_candidates = min(num_of_candidates, num_of_cities - 1)
+    # the nearest point found for each city is the city itself, so one more neighbour is queried
+    _, array_candidates = cKDTree(cities).query(cities, k=num_of_candidates + 1)
+    array_candidates = np.asarray(array_candidates).reshape((num_of_cities, -1))
+
+    # cities with duplicated coordinates could be returned before the city itself
+    array_self = array_candidates == np.arange(num_of_cities)[:, None]
+    array_self[~array_self.any(axis=1), -1] = True
+    return np.ascontiguousarray(array_candidates[~array_self].reshape((num_of_cities, num_of_candidates)))
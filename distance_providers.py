@@ -0,0 +1,211 @@
+import math
+from abc import ABC, abstractmethod
+import numpy as np
+from candidates import candidate_lists
+from instances import DICT_EDGE_WEIGHTS, BLOCK_ELEMENTS, calc_instance_distances
+
+
+class DistanceProvider(ABC):
+    """
+    Distances between cities used by the algorithms in place of the distance matrix. Distances are read as from
+    numpy array: provider[i, j] gives single distance for integer indexes and array of distances for arrays of
+    indexes (broadcast like numpy fancy indexing), provider[i] gives row of distances and np.asarray(provider)
+    builds the whole matrix (only for algorithms which keep N×N arrays anyway, like ant system).
+
+    :param num_of_cities: number of cities
+    :param dtype: type of the returned distances
+    """
+    ndim = 2
+
+    def __init__(self, num_of_cities: int, dtype: type = np.float64):
+        self.num_of_cities = num_of_cities
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def shape(self) -> tuple:
+        return self.num_of_cities, self.num_of_cities
+
+    def __len__(self) -> int:
+        return self.num_of_cities
+
+    def dist(self, i, j):
+        """
+        Distance between cities
+
+        :param i: index or numpy array of indexes of the first cities
+        :param j: index or numpy array of indexes of the second cities
+        :return: float for two integer indexes, numpy array of the broadcast shape of indexes otherwise
+        """
+        if isinstance(i, (int, np.integer)) and isinstance(j, (int, np.integer)):
+            return self.scalar_dist(int(i), int(j))
+        array_i, array_j = np.broadcast_arrays(np.asarray(i), np.asarray(j))
+        array_dist = self.batch_dist(array_i, array_j)
+        # 0-d arrays of indexes give scalar, like in numpy
+        return array_dist[()] if array_dist.ndim == 0 else array_dist
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        i, j = key
+        if isinstance(i, slice) or isinstance(j, slice):
+            # slice selects all pairs of rows and columns, like in numpy
+            array_i = np.arange(self.num_of_cities)[i] if isinstance(i, slice) else np.asarray(i)
+            array_j = np.arange(self.num_of_cities)[j] if isinstance(j, slice) else np.asarray(j)
+            return self.dist(array_i.reshape(array_i.shape + (1,) * array_j.ndim), array_j)
+        return self.dist(i, j)
+
+    def __array__(self, dtype=None, copy=None) -> np.array:
+        distance_matrix = self.matrix()
+        return distance_matrix if dtype is None else distance_matrix.astype(dtype, copy=False)
+
+    def matrix(self) -> np.array:
+        # rows are calculated in blocks, so temporary arrays are small
+        distance_matrix = np.empty(self.shape, dtype=self.dtype)
+        rows_in_block = max(1, BLOCK_ELEMENTS // max(self.num_of_cities, 1))
+        for start in range(0, self.num_of_cities, rows_in_block):
+            distance_matrix[start:start + rows_in_block] = self[start:start + rows_in_block]
+        return distance_matrix
+
+    @abstractmethod
+    def scalar_dist(self, i: int, j: int) -> float:
+        # distance between two cities given by integer indexes
+        pass
+
+    @abstractmethod
+    def batch_dist(self, array_i: np.array, array_j: np.array) -> np.array:
+        # distances between cities given by arrays of indexes of the same shape
+        pass
+
+
+class DenseDistances(DistanceProvider):
+    """
+    Distances read from precomputed distance matrix (which can be memory mapped)
+
+    :param distance_matrix: 2D numpy array of distances
+    """
+    def __init__(self, distance_matrix: np.array):
+        super().__init__(distance_matrix.shape[0], distance_matrix.dtype)
+        self.distance_matrix = distance_matrix
+
+    def scalar_dist(self, i: int, j: int) -> float:
+        return float(self.distance_matrix[i, j])
+
+    def batch_dist(self, array_i: np.array, array_j: np.array) -> np.array:
+        return self.distance_matrix[array_i, array_j]
+
+    def matrix(self) -> np.array:
+        return np.asarray(self.distance_matrix)
+
+
+class LazyDistances(DistanceProvider):
+    """
+    Distances calculated from coordinates of the cities each time they are needed, memory used does not depend
+    on the number of pairs of cities
+
+    :param cities: 2D numpy array of cities
+    :param edge_weight_type: type of distances (key of instances.DICT_EDGE_WEIGHTS)
+    :param dtype: type of the returned distances
+    """
+    def __init__(self, cities: np.array, edge_weight_type: str = 'EUCLIDEAN', dtype: type = np.float64):
+        if edge_weight_type not in DICT_EDGE_WEIGHTS:
+            raise ValueError(f"Unknown edge weight type '{edge_weight_type}', use one of: "
+                             f"{', '.join(DICT_EDGE_WEIGHTS)}")
+        super().__init__(cities.shape[0], dtype)
+        self.cities = np.ascontiguousarray(cities, dtype=np.float64)
+        self.edge_weight_type = edge_weight_type
+        # single distances are calculated on python lists, which is much faster than on numpy arrays
+        self.list_cities = self.cities.tolist()
+
+    def scalar_dist(self, i: int, j: int) -> float:
+        if i == j:
+            return 0.0
+        if self.edge_weight_type == 'EUCLIDEAN':
+            return math.dist(self.list_cities[i], self.list_cities[j])
+        return float(DICT_EDGE_WEIGHTS[self.edge_weight_type](self.cities[i], self.cities[j]))
+
+    def batch_dist(self, array_i: np.array, array_j: np.array) -> np.array:
+        # 0-d arrays of indexes give numpy scalar, which is turned into array to be changed
+        array_dist = np.asarray(DICT_EDGE_WEIGHTS[self.edge_weight_type](self.cities[array_i], self.cities[array_j]))
+        array_dist[array_i == array_j] = 0
+        return array_dist.astype(self.dtype, copy=False)
+
+    def matrix(self) -> np.array:
+        return calc_instance_distances(self.cities, self.edge_weight_type, self.dtype)
+
+
+class NeighbourDistances(LazyDistances):
+    """
+    Distances to the nearest neighbours of each city are calculated once and kept, other distances are
+    calculated from coordinates. Algorithms using candidate lists (like local search) read mostly kept
+    distances, while memory used grows only linearly with the number of cities. Numbers of distances read
+    from kept ones (hits) and calculated (misses) are counted.
+
+    :param cities: 2D numpy array of cities
+    :param num_of_candidates: number of nearest neighbours of each city with kept distances
+    :param edge_weight_type: type of distances (key of instances.DICT_EDGE_WEIGHTS)
+    :param dtype: type of the returned distances
+    """
+    def __init__(self, cities: np.array, num_of_candidates: int, edge_weight_type: str = 'EUCLIDEAN',
+                 dtype: type = np.float64):
+        super().__init__(cities, edge_weight_type, dtype)
+        self.array_candidates = candidate_lists(self.cities, num_of_candidates)
+        array_rows = np.repeat(np.arange(self.num_of_cities), self.array_candidates.shape[1])
+        array_cols = self.array_candidates.ravel()
+        array_dist = super().batch_dist(array_rows, array_cols)
+        # pairs of cities are kept as sorted keys (i * N + j) found by binary search
+        array_keys = array_rows * self.num_of_cities + array_cols
+        array_order = np.argsort(array_keys)
+        self.array_keys = array_keys[array_order]
+        self.array_kept_dist = array_dist[array_order]
+        # single distances are read from dictionaries of neighbours of each city
+        self.list_kept_dist = [dict(zip(row, row_dist)) for row, row_dist in
+                               zip(self.array_candidates.tolist(),
+                                   array_dist.reshape(self.array_candidates.shape).tolist())]
+        self.hits = 0
+        self.misses = 0
+
+    def scalar_dist(self, i: int, j: int) -> float:
+        dist = self.list_kept_dist[i].get(j)
+        if dist is None:
+            self.misses += 1
+            return super().scalar_dist(i, j)
+        self.hits += 1
+        return dist
+
+    def batch_dist(self, array_i: np.array, array_j: np.array) -> np.array:
+        array_keys = array_i.astype(np.int64) * self.num_of_cities + array_j
+        array_idx = np.minimum(np.searchsorted(self.array_keys, array_keys), self.array_keys.shape[0] - 1)
+        array_kept = self.array_keys[array_idx] == array_keys
+        num_of_kept = int(np.count_nonzero(array_kept))
+        self.hits += num_of_kept
+        self.misses += array_kept.size - num_of_kept
+        array_dist = np.empty(array_keys.shape, dtype=self.dtype)
+        array_dist[array_kept] = self.array_kept_dist[array_idx[array_kept]]
+        array_dist[~array_kept] = super().batch_dist(array_i[~array_kept], array_j[~array_kept])
+        return array_dist
+
+
+def distance_provider(cities: np.array,
+                      backend: str = 'dense',
+                      edge_weight_type: str = 'EUCLIDEAN',
+                      num_of_candidates: int = 10,
+                      dtype: type = np.float64) -> DistanceProvider:
+    """
+    Create distance provider for the cities
+
+    :param cities: 2D numpy array of cities
+    :param backend: way of getting distances. Can obtain three values: "dense" (whole matrix calculated
+    at the beginning), "lazy" (each distance calculated when needed) or "neighbours" (distances to the nearest
+    neighbours kept, other calculated when needed)
+    :param edge_weight_type: type of distances (key of instances.DICT_EDGE_WEIGHTS)
+    :param num_of_candidates: used only by "neighbours", number of nearest neighbours of each city
+    :param dtype: type of the returned distances
+    :return: distance provider which can be given to the algorithms instead of the distance matrix
+    """
+    if backend == 'dense':
+        return DenseDistances(calc_instance_distances(cities, edge_weight_type, dtype))
+    if backend == 'lazy':
+        return LazyDistances(cities, edge_weight_type, dtype)
+    if backend == 'neighbours':
+        return NeighbourDistances(cities, num_of_candidates, edge_weight_type, dtype)
+    raise ValueError(f"Unknown backend '{backend}', use one of: dense, lazy, neighbours")
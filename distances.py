@@ -0,0 +1,21 @@
+import numpy as np
+from scipy.spatial.distance import cdist
+
+
+def calc_distance_matrix(cities: np.array, dtype: type = np.float64) -> np.array:
+    """
+    Calculate matrix of euclidean distances between each pair of cities
+
+    :param cities: 2D numpy array of cities
+    :param dtype: type of the matrix elements, np.float32 halves the memory used by the matrix
+    :return: C-contiguous 2D numpy array of distances (with zeros on the diagonal)
+    """
+    # cdist computes whole matrix at once in compiled code
+    array_dist_between_cities = cdist(cities, cities, metric='euclidean')
+    return np.ascontiguousarray(array_dist_between_cities, dtype=dtype)
+
+
+def tour_length(path, distance_matrix: np.array) -> float:
+    # path ends with the starting city, so the cost is a sum of distances between consecutive cities
+    path = np.asarray(path)
+    return float(distance_matrix[path[:-1], path[1:]].sum(dtype=np.float64))
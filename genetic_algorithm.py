@@ -1,7 +1,15 @@
 import numpy as np
 import random
-from scipy.spatial import distance
-from typing import List, Tuple
+import time
+from typing import Callable, Iterator, Tuple
+from distances import calc_distance_matrix
+from termination import Termination, iteration_range
+from progress import make_progress, run_to_end
+from instrumentation import Instrumentation
+from initialization import open_path, initial_path_for
+from candidates import candidate_lists
+from local_search import local_search, NUM_OF_CANDIDATES
+from kernels import USE_NUMBA, cycle_crossover_kernel, order_crossover_kernel
 
 
 def genetic_algorithm(cities: np.array,
@@ -9,143 +17,426 @@ def genetic_algorithm(cities: np.array,
                       num_of_iter: int,
                       n: float,
                       mutation_probability: float,
-                      selection: str) -> Tuple[float, list]:
+                      selection: str,
+                      distance_matrix: np.array = None,
+                      termination: Termination = None,
+                      callback: Callable[[dict], bool] = None,
+                      use_local_search: bool = False,
+                      crossover: str = 'cx',
+                      instrumentation: Instrumentation = None,
+                      initial_path: list = None,
+                      initialization: str = 'random',
+                      return_statistics: bool = False) -> tuple:
     """
     Solving Traveling Salesman Problem using Genetic Algorithm
 
     :param cities: 2D numpy array of cities
     :param population_size: population used to find best path
-    :param num_of_iter: number of iterations
-    :param n: parent to population population size ratio
+    :param num_of_iter: number of iterations (no limit if None, then termination has to be given)
+    :param n: parent to population population size ratio (not used by "kbest" selection, which takes
+    the whole population as parents)
     :param mutation_probability: probability of population element mutation
     :param selection: selection algorithm used to determine parent population from
-    whole population. Can obtain two values: "roulette_wheel" or "kbest"
+    whole population. Can obtain values: "roulette_wheel", "sus" (stochastic universal sampling),
+    "tournament", "rank" or "kbest"
+    :param distance_matrix: precomputed distances between cities (calculated from cities if not given)
+    :param termination: additional stopping criteria checked after each generation
+    :param callback: function called with progress (see genetic_algorithm_iter) after finding new best path,
+    returning True stops the algorithm
+    :param use_local_search: if True each offspring is improved with 2-opt and Or-opt local search
+    (memetic algorithm)
+    :param crossover: operator used to create offsprings. Can obtain three values: "cx" (cycle crossover),
+    "ox" (order crossover) or "erx" (edge recombination crossover)
+    :param instrumentation: if given, time of each phase (selection, crossover, evaluation, local_search,
+    replacement), counters of generations, crossovers and evaluations and trace of the best and mean cost
+    of the population are collected in it
+    :param initial_path: path (for example found earlier for similar instance) put into initial population
+    in place of one random path
+    :param initialization: way of creating the first path when initial_path is not given. Can obtain values:
+    "random", "nearest_neighbour", "greedy", "space_filling_curve" or "christofides" (see initialization.py)
+    :param return_statistics: if True summary of instrumentation (created if not given) is returned
+    together with the result
     :return: best score (as an float) and best route (indexes of the cities) found
+    (and summary of instrumentation if return_statistics is True)
     """
+    if return_statistics and instrumentation is None:
+        instrumentation = Instrumentation()
+    return run_to_end(genetic_algorithm_iter(cities, population_size, num_of_iter, n, mutation_probability,
+                                             selection, distance_matrix, termination, use_local_search, crossover,
+                                             instrumentation, initial_path, initialization),
+                      callback, instrumentation if return_statistics else None)
+
+
+def genetic_algorithm_iter(cities: np.array,
+                           population_size: int,
+                           num_of_iter: int,
+                           n: float,
+                           mutation_probability: float,
+                           selection: str,
+                           distance_matrix: np.array = None,
+                           termination: Termination = None,
+                           use_local_search: bool = False,
+                           crossover: str = 'cx',
+                           instrumentation: Instrumentation = None,
+                           initial_path: list = None,
+                           initialization: str = 'random') -> Iterator[dict]:
+    """
+    Genetic Algorithm yielding progress each time new best path is found, parameters are the same as in
+    genetic_algorithm. Search can be cancelled at any moment by closing the generator.
+
+    :return: generator of dictionaries with best_score, best_path, iteration (number of generations),
+    evaluations (number of paths) and elapsed (seconds from the start)
+    """
+    start_time = time.perf_counter()
+    # time limit counts also preparation (distances, candidate lists, initial paths)
+    if termination is not None:
+        termination.start()
     num_of_cities = cities.shape[0]
+    if distance_matrix is None:
+        distance_matrix = calc_distance_matrix(cities)
+    if instrumentation is not None:
+        instrumentation.watch_cache('distance_cache', distance_matrix)
+    num_of_parents = number_of_parents(selection, n, population_size)
+    if selection not in DICT_SELECTIONS:
+        raise ValueError(f"Unknown selection '{selection}', use one of: {', '.join(DICT_SELECTIONS)}")
+    selection_function = DICT_SELECTIONS[selection]
+    if crossover not in DICT_CROSSOVERS:
+        raise ValueError(f"Unknown crossover '{crossover}', use one of: {', '.join(DICT_CROSSOVERS)}")
+    # offsprings and crossover working arrays are allocated once (offsprings are copied into population)
+    array_offsprings = np.empty((num_of_parents, num_of_cities), dtype=np.int64)
+    dict_buffers = create_crossover_buffers(num_of_cities)
+    array_candidates = None
+    if use_local_search:
+        array_candidates = candidate_lists(cities, NUM_OF_CANDIDATES)
 
-    # create initial population of population_size paths
-    list_population = create_initial_population(population_size, num_of_cities)
+    # create initial population of population_size paths, each row is one path
+    array_population = create_initial_population(population_size, num_of_cities)
+    # path built by construction heuristic replaces one random path
+    initial_path = initial_path_for(cities, initialization, initial_path)
+    if initial_path is not None:
+        array_population[0] = open_path(initial_path, num_of_cities)
     # evaluate cost for whole population
-    list_population = evaluate_cost(list_population, cities)
-    if selection == "kbest":
-        list_population = sorted(list_population, key=lambda population_element: population_element['dist_traveled'])
-
-    list_parents = []
-    for i in range(num_of_iter):
-        # make list of parents of size n times population size by different types of selection
-        if selection == "roulette_wheel":
-            list_parents = roulette_wheel_algorithm(list_population, population_size, n)
-        elif selection == "kbest":
-            list_parents = list_population[:population_size]
-        # create offsprings and perform cycle crossover with mutation on them
-        list_offsprings = create_offsprings(list_parents, mutation_probability)
-        # evaluate distances
-        list_offsprings = evaluate_cost(list_offsprings, cities)
-        # concatenate parents and offsprings to create new population, then sort them by distances
-        list_population = list_parents + list_offsprings
-        list_population = sorted(list_population, key=lambda population_element: population_element['dist_traveled'])
-    best_score = list_population[0]['dist_traveled']
-    best_path = list_population[0]['path']
-    return best_score, best_path
-
-
-def create_initial_population(population_size: int, num_of_cities) -> List[dict]:
-    list_population = []
-    # for each parent in population create list of indexes and
-    # calculate total distance traveled (cost) equal to 0
-    for i in range(population_size):
-        list_of_cities_idx = [idx for idx in range(num_of_cities)]
-        # (shuffle method works in place and returns nothing)
-        random.shuffle(list_of_cities_idx)
-
-        # add idx of the first city
-        list_of_cities_idx.append(list_of_cities_idx[0])
-        list_population.append({'path': list_of_cities_idx, 'dist_traveled': 0})
-    return list_population
-
-
-def evaluate_cost(list_population: List[dict], cities: np.array) -> List[dict]:
-    for population_element in list_population:
-        for list_idx in range(1, len(population_element['path'])):
-            actual_city = cities[population_element['path'][list_idx]]
-            previous_city = cities[population_element['path'][list_idx-1]]
-            population_element['dist_traveled'] += distance.euclidean(actual_city, previous_city)
-    return list_population
-
-
-def roulette_wheel_algorithm(list_population: List[dict], population_size: int, n: float) -> List[dict]:
-    # checking maximum value of dist_traveled to scale date for calculating probabilities
-    max_list_val = 0
-    for population_element in list_population:
-        if population_element['dist_traveled'] > max_list_val:
-            max_list_val = population_element['dist_traveled']
-    # calculating sum of distances
-    sum_of_dist = sum([max_list_val-population_element['dist_traveled'] for population_element in list_population])
-    # relative probabilities for each element of population
-    relative_probabilities = [(max_list_val-population_element['dist_traveled'])/sum_of_dist
-                              for population_element in list_population]
-    # cumulative probabilities for each element of population
-    cumulative_probabilities = [sum(relative_probabilities[:i+1]) for i in range(len(relative_probabilities))]
-    list_parents = []
-    # selection loop
-    while len(list_parents) < n*population_size:
-        rand = random.uniform(0, 1)
-        idx = 0
-        while cumulative_probabilities[idx] < rand:
-            idx += 1
-        list_parents.append(list_population[idx])
-    return list_parents
-
-
-def create_offsprings(list_parents: List[dict], mutation_probability: float) -> list:
-    list_offspring = []
-    while len(list_offspring) != len(list_parents):
-        rand_parent_1 = random.choice(list_parents)
-        rand_parent_2 = random.choice(list_parents)
-
-        offspring_1 = cycle_crossover_with_mutation(rand_parent_1['path'],
-                                                    rand_parent_2['path'],
-                                                    mutation_probability)
-        offspring_2 = cycle_crossover_with_mutation(rand_parent_2['path'],
-                                                    rand_parent_1['path'],
-                                                    mutation_probability)
-
-        list_offspring.append({'path': offspring_1, 'dist_traveled': 0})
-        list_offspring.append({'path': offspring_2, 'dist_traveled': 0})
-    return list_offspring
-
-
-def cycle_crossover_with_mutation(path_1: list, path_2: list, mutation_probability: float) -> list:
-    parent_without_return_1 = path_1[:-1]
-    parent_without_return_2 = path_2[:-1]
-    offspring = [-1] * len(parent_without_return_1)
+    array_fitness = evaluate_cost(array_population, distance_matrix)
+    num_of_evaluations = population_size
+    best_score, best_path = best_of_population(array_population, array_fitness)
+    yield make_progress(best_score, best_path, 0, num_of_evaluations, start_time)
+    if termination is not None:
+        termination.update(array_fitness.min(), population_size)
+
+    for i in iteration_range(num_of_iter, termination):
+        if termination is not None and termination.reason is not None:
+            break
+        if instrumentation is not None:
+            instrumentation.start_laps()
+        array_population, array_fitness = next_generation(array_population, array_fitness, array_offsprings,
+                                                          distance_matrix, selection_function,
+                                                          mutation_probability, crossover, dict_buffers,
+                                                          array_candidates, instrumentation)
+
+        num_of_evaluations += array_offsprings.shape[0]
+        if instrumentation is not None:
+            instrumentation.count('generations')
+            instrumentation.trace(i + 1, best=float(array_fitness.min()), mean=float(array_fitness.mean()))
+        if array_fitness.min() < best_score:
+            best_score, best_path = best_of_population(array_population, array_fitness)
+            if instrumentation is not None:
+                instrumentation.count('improvements')
+            yield make_progress(best_score, best_path, i + 1, num_of_evaluations, start_time)
+
+        if termination is not None and termination.update(array_fitness.min(), array_offsprings.shape[0]):
+            break
+
+
+def next_generation(array_population: np.array,
+                    array_fitness: np.array,
+                    array_offsprings: np.array,
+                    distance_matrix: np.array,
+                    selection_function: Callable[[np.array, int], np.array],
+                    mutation_probability: float,
+                    crossover: str,
+                    dict_buffers: dict,
+                    array_candidates: np.array = None,
+                    instrumentation: Instrumentation = None) -> Tuple[np.array, np.array]:
+    """
+    Create one generation of the Genetic Algorithm
+
+    :param array_population: 2D numpy array of paths, each row is one path
+    :param array_fitness: 1D numpy array with cost of each path
+    :param array_offsprings: preallocated array for offsprings, its number of rows is the number of parents
+    :param distance_matrix: precomputed distances between cities
+    :param selection_function: function from DICT_SELECTIONS
+    :param mutation_probability: probability of population element mutation
+    :param crossover: name of the crossover from DICT_CROSSOVERS
+    :param dict_buffers: working arrays created by create_crossover_buffers
+    :param array_candidates: nearest neighbours of each city, if given offsprings are improved by local search
+    :param instrumentation: if given, time of each phase and counters are added to it
+    :return: new population and costs of its paths
+    """
+    population_size = array_population.shape[0]
+    # choose indexes of parents of size n times population size by different types of selection
+    array_parents_idx = selection_function(array_fitness, array_offsprings.shape[0])
+    if instrumentation is not None:
+        instrumentation.lap('selection')
+    # create offsprings and perform crossover with mutation on them
+    array_offsprings = create_offsprings(array_population[array_parents_idx], array_offsprings,
+                                         mutation_probability, crossover, dict_buffers)
+    if instrumentation is not None:
+        instrumentation.lap('crossover')
+        instrumentation.count('crossovers', array_offsprings.shape[0])
+        instrumentation.count('evaluations', array_offsprings.shape[0])
+    # evaluate distances
+    if array_candidates is not None:
+        array_offsprings_fitness = improve_offsprings(array_offsprings, distance_matrix, array_candidates)
+        if instrumentation is not None:
+            instrumentation.lap('local_search')
+    else:
+        array_offsprings_fitness = evaluate_cost(array_offsprings, distance_matrix)
+        if instrumentation is not None:
+            instrumentation.lap('evaluation')
+    # concatenate population and offsprings, then keep population_size paths of minimum cost
+    array_population = np.concatenate((array_population, array_offsprings))
+    array_fitness = np.concatenate((array_fitness, array_offsprings_fitness))
+    array_survivors_idx = best_indexes(array_fitness, population_size)
+    if instrumentation is not None:
+        instrumentation.lap('replacement')
+    return array_population[array_survivors_idx], array_fitness[array_survivors_idx]
+
+
+def best_of_population(array_population: np.array, array_fitness: np.array) -> Tuple[float, list]:
+    best_idx = np.argmin(array_fitness)
+    best_path = array_population[best_idx].tolist()
+    # add return to the first city
+    best_path.append(best_path[0])
+    return float(array_fitness[best_idx]), best_path
+
+
+def create_initial_population(population_size: int, num_of_cities: int) -> np.array:
+    # sorting random keys gives random permutation of city indexes in each row
+    array_keys = np.random.uniform(0, 1, size=(population_size, num_of_cities))
+    return np.argsort(array_keys, axis=1)
+
+
+def evaluate_cost(array_population: np.array, distance_matrix: np.array) -> np.array:
+    # distances of all arcs (including return to the first city) are gathered at once and summed up
+    array_next_cities = np.roll(array_population, -1, axis=1)
+    return distance_matrix[array_population, array_next_cities].sum(axis=1, dtype=np.float64)
+
+
+def improve_offsprings(array_offsprings: np.array, distance_matrix: np.array, array_candidates: np.array) -> np.array:
+    # offsprings are replaced in place by the locally optimal paths, their costs are returned
+    array_offsprings_fitness = np.empty(array_offsprings.shape[0])
+    for offspring_idx, offspring in enumerate(array_offsprings):
+        array_offsprings_fitness[offspring_idx], improved_path = local_search(offspring, distance_matrix,
+                                                                              array_candidates)
+        array_offsprings[offspring_idx] = improved_path[:-1]
+    return array_offsprings_fitness
+
+
+def best_indexes(array_fitness: np.array, num_of_elements: int) -> np.array:
+    # partial sort is enough to find num_of_elements paths of minimum cost
+    if num_of_elements >= array_fitness.shape[0]:
+        return np.arange(array_fitness.shape[0])
+    return np.argpartition(array_fitness, num_of_elements - 1)[:num_of_elements]
+
+
+def roulette_wheel_algorithm(array_fitness: np.array, num_of_parents: int) -> np.array:
+    # each parent is drawn independently with probability proportional to its scaled fitness
+    array_cumulative = cumulative_probabilities(array_fitness.max() - array_fitness)
+    return draw_from_cumulative(array_cumulative, np.random.uniform(0, 1, size=num_of_parents))
+
+
+def stochastic_universal_sampling(array_fitness: np.array, num_of_parents: int) -> np.array:
+    # parents are pointed by equally spaced pointers with one random offset, which gives minimum spread
+    array_cumulative = cumulative_probabilities(array_fitness.max() - array_fitness)
+    array_pointers = (np.random.uniform(0, 1) + np.arange(num_of_parents)) / num_of_parents
+    return draw_from_cumulative(array_cumulative, array_pointers)
+
+
+def rank_selection(array_fitness: np.array, num_of_parents: int) -> np.array:
+    # probability depends only on the position in population sorted by cost (the best has weight P, the worst 1)
+    population_size = array_fitness.shape[0]
+    array_weights = np.empty(population_size)
+    array_weights[np.argsort(array_fitness)] = np.arange(population_size, 0, -1)
+    array_cumulative = cumulative_probabilities(array_weights)
+    return draw_from_cumulative(array_cumulative, np.random.uniform(0, 1, size=num_of_parents))
+
+
+def tournament_selection(array_fitness: np.array, num_of_parents: int) -> np.array:
+    # the best of TOURNAMENT_SIZE randomly chosen elements becomes a parent
+    array_contestants = np.random.randint(0, array_fitness.shape[0], size=(num_of_parents, TOURNAMENT_SIZE))
+    array_winners = np.argmin(array_fitness[array_contestants], axis=1)
+    return array_contestants[np.arange(num_of_parents), array_winners]
+
+
+def number_of_parents(selection: str, n: float, population_size: int) -> int:
+    # k-best selection takes each element of the population as a parent (as sorted population in the first
+    # version of the algorithm), other selections choose n times population size parents
+    if selection == 'kbest':
+        return population_size
+    return int(n * population_size)
+
+
+def kbest_selection(array_fitness: np.array, num_of_parents: int) -> np.array:
+    return best_indexes(array_fitness, num_of_parents)
+
+
+def cumulative_probabilities(array_weights: np.array) -> np.array:
+    sum_of_weights = array_weights.sum()
+    # when all weights are equal to 0 each element is equally probable
+    if sum_of_weights <= 0:
+        array_weights = np.ones_like(array_weights)
+        sum_of_weights = array_weights.shape[0]
+    return np.cumsum(array_weights) / sum_of_weights
+
+
+def draw_from_cumulative(array_cumulative: np.array, array_rand: np.array) -> np.array:
+    # binary search of the first element with cumulative probability greater than random number
+    array_idx = np.searchsorted(array_cumulative, array_rand, side='right')
+    return np.minimum(array_idx, array_cumulative.shape[0] - 1)
+
+
+# number of elements competing in one tournament
+TOURNAMENT_SIZE = 3
+# selection algorithms returning indexes of parents
+DICT_SELECTIONS = {'roulette_wheel': roulette_wheel_algorithm,
+                   'sus': stochastic_universal_sampling,
+                   'tournament': tournament_selection,
+                   'rank': rank_selection,
+                   'kbest': kbest_selection}
+
+
+def create_offsprings(array_parents: np.array,
+                      array_offsprings: np.array,
+                      mutation_probability: float,
+                      crossover: str,
+                      dict_buffers: dict) -> np.array:
+    crossover_function = DICT_CROSSOVERS[crossover]
+    num_of_parents = array_parents.shape[0]
+    for offspring_idx in range(0, num_of_parents, 2):
+        rand_parent_1 = array_parents[random.randint(0, num_of_parents - 1)]
+        rand_parent_2 = array_parents[random.randint(0, num_of_parents - 1)]
+
+        # offsprings are written directly into rows of preallocated array
+        crossover_function(rand_parent_1, rand_parent_2, array_offsprings[offspring_idx], dict_buffers)
+        mutation(array_offsprings[offspring_idx], mutation_probability)
+        if offspring_idx + 1 < num_of_parents:
+            crossover_function(rand_parent_2, rand_parent_1, array_offsprings[offspring_idx + 1], dict_buffers)
+            mutation(array_offsprings[offspring_idx + 1], mutation_probability)
+    return array_offsprings
+
+
+def create_crossover_buffers(num_of_cities: int) -> dict:
+    # arrays reused by each crossover instead of allocating new ones
+    return {'position': np.empty(num_of_cities, dtype=np.int64),
+            'mask': np.empty(num_of_cities, dtype=bool),
+            'adjacency': np.empty((num_of_cities, 4), dtype=np.int64)}
+
+
+def cycle_crossover(parent_1: np.array, parent_2: np.array, offspring: np.array, dict_buffers: dict) -> None:
+    if USE_NUMBA:
+        cycle_crossover_kernel(parent_1, parent_2, offspring, dict_buffers['position'], dict_buffers['mask'])
+        return
+    # inverse index: position of each city in the first parent
+    array_position = dict_buffers['position']
+    array_position[parent_1] = np.arange(parent_1.shape[0])
     # Cycle crossover realized in 5 steps
     # 1. start with the frst unused position of O and the frst allele of P1
-    offspring[0] = parent_without_return_1[0]
     # 2. look at the allele in the same position in P2
-    value_to_find = parent_without_return_2[0]
-    for i in range(len(offspring)-1):  # maximum possible number of iteration
-        # 3. go to the position with the same allele in P1
-        value_idx = parent_without_return_1.index(value_to_find)
-        # 4. add this allele into cycle
-        offspring[value_idx] = value_to_find
-        # 5. repeat steps 2 through 4 until arrive at the frst allele of P1
-        value_to_find = parent_without_return_2[value_idx]
-        if value_to_find in offspring:
+    # 3. go to the position with the same allele in P1
+    # 4. add this allele into cycle
+    # 5. repeat steps 2 through 4 until arrive at the frst allele of P1
+    list_next_position = array_position[parent_2].tolist()
+    list_cycle = [0]
+    position = list_next_position[0]
+    while position != 0:
+        list_cycle.append(position)
+        position = list_next_position[position]
+    # positions from the cycle are taken from the first parent, other from the second one
+    array_mask = dict_buffers['mask']
+    array_mask[:] = False
+    array_mask[list_cycle] = True
+    np.copyto(offspring, parent_2)
+    offspring[array_mask] = parent_1[array_mask]
+
+
+def order_crossover(parent_1: np.array, parent_2: np.array, offspring: np.array, dict_buffers: dict) -> None:
+    num_of_cities = parent_1.shape[0]
+    # segment between two cut points is copied from the first parent
+    cut_1, cut_2 = sorted(random.sample(range(num_of_cities + 1), 2))
+    if USE_NUMBA:
+        order_crossover_kernel(parent_1, parent_2, offspring, dict_buffers['mask'], cut_1, cut_2)
+        return
+    offspring[cut_1:cut_2] = parent_1[cut_1:cut_2]
+    array_in_segment = dict_buffers['mask']
+    array_in_segment[:] = False
+    array_in_segment[parent_1[cut_1:cut_2]] = True
+    # remaining positions (starting after the second cut point) are filled with cities of the second parent
+    # in the order they appear in it (also starting after the second cut point)
+    array_rest = np.roll(parent_2, -cut_2)
+    array_rest = array_rest[~array_in_segment[array_rest]]
+    offspring[cut_2:] = array_rest[:num_of_cities - cut_2]
+    offspring[:cut_1] = array_rest[num_of_cities - cut_2:]
+
+
+def edge_recombination_crossover(parent_1: np.array, parent_2: np.array, offspring: np.array,
+                                 dict_buffers: dict) -> None:
+    num_of_cities = parent_1.shape[0]
+    # table of neighbours of each city in both parents, edges common for parents are stored once (-1 is empty)
+    array_adjacency = dict_buffers['adjacency']
+    array_adjacency[parent_1, 0] = np.roll(parent_1, 1)
+    array_adjacency[parent_1, 1] = np.roll(parent_1, -1)
+    array_adjacency[parent_2, 2] = np.roll(parent_2, 1)
+    array_adjacency[parent_2, 3] = np.roll(parent_2, -1)
+    array_common = (array_adjacency[:, 2:] == array_adjacency[:, :1]) | \
+        (array_adjacency[:, 2:] == array_adjacency[:, 1:2])
+    array_adjacency[:, 2:][array_common] = -1
+    list_adjacency = array_adjacency.tolist()
+    list_degree = (array_adjacency >= 0).sum(axis=1).tolist()
+
+    # not visited cities with their positions, used when the actual city has no free neighbours
+    list_unvisited = parent_1.tolist()
+    array_position = dict_buffers['position']
+    array_position[parent_1] = np.arange(num_of_cities)
+    list_position = array_position.tolist()
+
+    list_offspring = []
+    city = list_unvisited[0]
+    while True:
+        list_offspring.append(city)
+        # remove city from the not visited ones (swap with the last one)
+        last_city = list_unvisited.pop()
+        if last_city != city:
+            list_unvisited[list_position[city]] = last_city
+            list_position[last_city] = list_position[city]
+        if not list_unvisited:
             break
-    # fill other city indexes using second parent indexes
-    for idx, val in enumerate(offspring):
-        if val == -1:
-            offspring[idx] = parent_without_return_2[idx]
-    # check for mutation
-    offspring = mutation(offspring, mutation_probability)
-    # append starting point
-    offspring.append(offspring[0])
-    return offspring
+        # remove city from neighbours tables
+        for neighbour in list_adjacency[city]:
+            if neighbour >= 0:
+                list_neighbour_adjacency = list_adjacency[neighbour]
+                list_neighbour_adjacency[list_neighbour_adjacency.index(city)] = -1
+                list_degree[neighbour] -= 1
+        # next city is the neighbour with the fewest own neighbours (ties are broken randomly)
+        next_city = -1
+        min_degree = 5
+        for neighbour in list_adjacency[city]:
+            if neighbour >= 0 and (list_degree[neighbour] < min_degree or
+                                   (list_degree[neighbour] == min_degree and random.random() < 0.5)):
+                next_city = neighbour
+                min_degree = list_degree[neighbour]
+        if next_city == -1:
+            next_city = list_unvisited[random.randint(0, len(list_unvisited) - 1)]
+        city = next_city
+    offspring[:] = list_offspring
+
+
+# crossover operators creating offspring from two parents
+DICT_CROSSOVERS = {'cx': cycle_crossover,
+                   'ox': order_crossover,
+                   'erx': edge_recombination_crossover}
 
 
-def mutation(offspring: list, mutation_probability: float) -> list:
+def mutation(offspring: np.array, mutation_probability: float) -> np.array:
     # checking if offspring should mutate by using uniform distribution
     rand = random.uniform(0, 1)
     if rand <= mutation_probability:
@@ -0,0 +1,305 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import minimum_spanning_tree, connected_components
+from scipy.spatial import cKDTree, Delaunay, QhullError
+
+# number of nearest neighbours used to find candidate edges
+NUM_OF_NEIGHBOURS = 10
+# order of Hilbert curve (number of bits of each coordinate)
+HILBERT_ORDER = 16
+
+
+def construct_path(cities: np.array, initialization: str) -> list:
+    """
+    Build path using construction heuristic, used to seed the algorithms instead of random paths.
+    Heuristics work on coordinates of the cities (euclidean distances) and use KD-tree, so they
+    are fast also for large instances.
+
+    :param cities: 2D numpy array of cities
+    :param initialization: heuristic (key of DICT_INITIALIZATIONS)
+    :return: path with return to the starting city
+    """
+    if initialization not in DICT_INITIALIZATIONS:
+        raise ValueError(f"Unknown initialization '{initialization}', use one of: random, "
+                         f"{', '.join(DICT_INITIALIZATIONS)}")
+    cities = np.asarray(cities, dtype=np.float64)
+    if cities.shape[0] < 4:
+        return list(range(cities.shape[0])) + [0]
+    return DICT_INITIALIZATIONS[initialization](cities)
+
+
+def initial_path_for(cities: np.array, initialization: str, initial_path: list = None) -> list:
+    # path given by the user has priority over the heuristic, random initialization gives no path
+    if initial_path is not None or initialization == 'random':
+        return initial_path
+    return construct_path(cities, initialization)
+
+
+def open_path(path, num_of_cities: int) -> list:
+    """
+    Check path given to seed the algorithm and remove return to the starting city
+
+    :param path: path (indexes of the cities) with or without return to the starting city
+    :param num_of_cities: number of cities of the instance
+    :return: list of indexes of the cities without return to the starting city
+    """
+    path = [int(city) for city in path]
+    if len(path) == num_of_cities + 1 and path[0] == path[-1]:
+        path = path[:-1]
+    if len(path) != num_of_cities or len(set(path)) != num_of_cities or min(path) < 0 or max(path) >= num_of_cities:
+        raise ValueError('Initial path has to visit each city exactly once')
+    return path
+
+
+def nearest_neighbour(cities: np.array, start: int = 0) -> list:
+    # salesman always goes to the nearest not visited city, KD-tree of not visited cities is rebuilt
+    # when half of them were visited, so queries do not skip many visited cities
+    num_of_cities = cities.shape[0]
+    array_visited = np.zeros(num_of_cities, dtype=bool)
+    array_visited[start] = True
+    array_tree_cities = np.flatnonzero(~array_visited)
+    tree = cKDTree(cities[array_tree_cities])
+    num_of_free_in_tree = array_tree_cities.shape[0]
+    path = [start]
+    city = start
+    for _ in range(num_of_cities - 1):
+        if 2 * num_of_free_in_tree < array_tree_cities.shape[0]:
+            array_tree_cities = np.flatnonzero(~array_visited)
+            tree = cKDTree(cities[array_tree_cities])
+        num_of_neighbours = 8
+        while True:
+            num_of_neighbours = min(num_of_neighbours, array_tree_cities.shape[0])
+            _, array_idx = tree.query(cities[city], k=num_of_neighbours)
+            array_near = array_tree_cities[np.atleast_1d(array_idx)]
+            array_near = array_near[~array_visited[array_near]]
+            if array_near.shape[0] > 0:
+                break
+            num_of_neighbours *= 2
+        city = int(array_near[0])
+        array_visited[city] = True
+        num_of_free_in_tree -= 1
+        path.append(city)
+    path.append(start)
+    return path
+
+
+def greedy_edge(cities: np.array) -> list:
+    # the shortest candidate edges are added if both cities have less than two edges and the edge does not
+    # close a cycle, remaining fragments are joined by nearest neighbour rule on their ends
+    num_of_cities = cities.shape[0]
+    array_from, array_to, array_length = candidate_edges(cities)
+    array_order = np.argsort(array_length, kind='stable')
+    list_degree = [0] * num_of_cities
+    list_parent = list(range(num_of_cities))
+    list_adjacency = [[] for _ in range(num_of_cities)]
+
+    def find(city: int) -> int:
+        while list_parent[city] != city:
+            list_parent[city] = list_parent[list_parent[city]]
+            city = list_parent[city]
+        return city
+
+    for city_1, city_2 in zip(array_from[array_order].tolist(), array_to[array_order].tolist()):
+        if list_degree[city_1] >= 2 or list_degree[city_2] >= 2:
+            continue
+        root_1, root_2 = find(city_1), find(city_2)
+        if root_1 == root_2:
+            continue
+        list_parent[root_1] = root_2
+        list_degree[city_1] += 1
+        list_degree[city_2] += 1
+        list_adjacency[city_1].append(city_2)
+        list_adjacency[city_2].append(city_1)
+
+    # each fragment is a path between two ends (single city is both ends of its fragment)
+    list_fragments = []
+    array_used = np.zeros(num_of_cities, dtype=bool)
+    for city in range(num_of_cities):
+        if list_degree[city] < 2 and not array_used[city]:
+            fragment = walk_fragment(city, list_adjacency)
+            array_used[fragment] = True
+            list_fragments.append(fragment)
+    return join_fragments(cities, list_fragments)
+
+
+def space_filling_curve(cities: np.array) -> list:
+    # cities are visited in order of their position on Hilbert curve covering the bounding box
+    array_min = cities.min(axis=0)
+    scale = max(float(np.max(cities.max(axis=0) - array_min)), 1e-12)
+    array_grid = ((cities - array_min) / scale * (2 ** HILBERT_ORDER - 1)).astype(np.int64)
+    array_order = np.argsort(hilbert_index(array_grid[:, 0], array_grid[:, 1]), kind='stable')
+    path = array_order.tolist()
+    path.append(path[0])
+    return path
+
+
+def christofides(cities: np.array) -> list:
+    # Christofides-style approximation: minimum spanning tree (found on Delaunay triangulation, which contains
+    # euclidean minimum spanning tree), cities of odd degree are matched greedily instead of minimum weight
+    # perfect matching, then Euler tour of the multigraph is shortcut to visit each city once
+    num_of_cities = cities.shape[0]
+    list_edges = minimum_spanning_edges(cities)
+    array_degree = np.zeros(num_of_cities, dtype=np.int64)
+    for city_1, city_2 in list_edges:
+        array_degree[city_1] += 1
+        array_degree[city_2] += 1
+    list_edges.extend(greedy_matching(cities, np.flatnonzero(array_degree % 2 == 1)))
+
+    list_adjacency = [[] for _ in range(num_of_cities)]
+    for edge_idx, (city_1, city_2) in enumerate(list_edges):
+        list_adjacency[city_1].append((city_2, edge_idx))
+        list_adjacency[city_2].append((city_1, edge_idx))
+    # Hierholzer's algorithm, cities are added to the path when they appear in the tour for the first time
+    array_edge_used = np.zeros(len(list_edges), dtype=bool)
+    array_visited = np.zeros(num_of_cities, dtype=bool)
+    list_stack = [0]
+    list_tour = []
+    while list_stack:
+        city = list_stack[-1]
+        list_city_edges = list_adjacency[city]
+        while list_city_edges and array_edge_used[list_city_edges[-1][1]]:
+            list_city_edges.pop()
+        if list_city_edges:
+            next_city, edge_idx = list_city_edges.pop()
+            array_edge_used[edge_idx] = True
+            list_stack.append(next_city)
+        else:
+            list_stack.pop()
+            if not array_visited[city]:
+                array_visited[city] = True
+                list_tour.append(city)
+    list_tour.append(list_tour[0])
+    return list_tour
+
+
+def candidate_edges(cities: np.array) -> tuple:
+    # edges to the nearest neighbours of each city (each edge once)
+    num_of_neighbours = min(NUM_OF_NEIGHBOURS, cities.shape[0] - 1)
+    array_length, array_neighbours = cKDTree(cities).query(cities, k=num_of_neighbours + 1)
+    array_from = np.repeat(np.arange(cities.shape[0]), num_of_neighbours + 1)
+    array_to = array_neighbours.ravel()
+    array_length = array_length.ravel()
+    array_keep = array_from < array_to
+    return array_from[array_keep], array_to[array_keep], array_length[array_keep]
+
+
+def walk_fragment(end: int, list_adjacency: list) -> list:
+    # go from one end of the fragment to the other one
+    fragment = [end]
+    previous, city = -1, end
+    while True:
+        list_next = [neighbour for neighbour in list_adjacency[city] if neighbour != previous]
+        if not list_next:
+            return fragment
+        previous, city = city, list_next[0]
+        fragment.append(city)
+
+
+def join_fragments(cities: np.array, list_fragments: list) -> list:
+    # from the last city of the path go to the nearest end of not used fragment
+    array_ends = np.array([end for fragment in list_fragments for end in (fragment[0], fragment[-1])])
+    array_end_fragment = np.repeat(np.arange(len(list_fragments)), 2)
+    array_used = np.zeros(len(list_fragments), dtype=bool)
+    tree = cKDTree(cities[array_ends])
+    path = list(list_fragments[0])
+    array_used[0] = True
+    for _ in range(len(list_fragments) - 1):
+        num_of_neighbours = 8
+        while True:
+            num_of_neighbours = min(num_of_neighbours, array_ends.shape[0])
+            _, array_idx = tree.query(cities[path[-1]], k=num_of_neighbours)
+            array_idx = np.atleast_1d(array_idx)
+            array_idx = array_idx[~array_used[array_end_fragment[array_idx]]]
+            if array_idx.shape[0] > 0:
+                break
+            num_of_neighbours *= 2
+        end_idx = int(array_idx[0])
+        fragment_idx = array_end_fragment[end_idx]
+        array_used[fragment_idx] = True
+        fragment = list_fragments[fragment_idx]
+        # fragment is entered from its nearest end
+        path.extend(fragment if end_idx % 2 == 0 else fragment[::-1])
+    path.append(path[0])
+    return path
+
+
+def hilbert_index(array_x: np.array, array_y: np.array) -> np.array:
+    # distance of each point along Hilbert curve, calculated for all points at once
+    array_x, array_y = array_x.copy(), array_y.copy()
+    n = 2 ** HILBERT_ORDER
+    array_index = np.zeros(array_x.shape[0], dtype=np.int64)
+    s = n // 2
+    while s > 0:
+        array_rx = (array_x & s) > 0
+        array_ry = (array_y & s) > 0
+        array_index += s * s * ((3 * array_rx.astype(np.int64)) ^ array_ry.astype(np.int64))
+        # rotate quadrant, so the curve inside it has standard orientation
+        array_flip = ~array_ry & array_rx
+        array_x[array_flip] = n - 1 - array_x[array_flip]
+        array_y[array_flip] = n - 1 - array_y[array_flip]
+        array_swap = ~array_ry
+        array_x[array_swap], array_y[array_swap] = array_y[array_swap], array_x[array_swap].copy()
+        s //= 2
+    return array_index
+
+
+def minimum_spanning_edges(cities: np.array) -> list:
+    num_of_cities = cities.shape[0]
+    array_from, array_to, _ = candidate_edges(cities)
+    try:
+        # edges of Delaunay triangulation contain euclidean minimum spanning tree
+        array_simplices = Delaunay(cities).simplices
+        array_from = np.concatenate((array_from, array_simplices[:, [0, 1, 2]].ravel()))
+        array_to = np.concatenate((array_to, array_simplices[:, [1, 2, 0]].ravel()))
+    except (QhullError, ValueError):
+        # degenerate instances (for example all cities on one line) use only neighbour edges
+        pass
+    # duplicated edges would be summed up by sparse matrix, so each edge is kept once
+    array_keys = np.unique(np.minimum(array_from, array_to) * num_of_cities + np.maximum(array_from, array_to))
+    array_from, array_to = array_keys // num_of_cities, array_keys % num_of_cities
+    # zero length edges (cities in the same place) would be treated as missing edges
+    array_length = np.hypot(*(cities[array_from] - cities[array_to]).T) + 1e-12
+    graph = coo_matrix((array_length, (array_from, array_to)), shape=(num_of_cities, num_of_cities)).tocsr()
+    tree = minimum_spanning_tree(graph).tocoo()
+    list_edges = list(zip(tree.row.tolist(), tree.col.tolist()))
+
+    # components not connected by candidate edges are connected by their nearest cities
+    num_of_components, array_labels = connected_components(tree, directed=False)
+    while num_of_components > 1:
+        array_component = np.flatnonzero(array_labels == 0)
+        array_rest = np.flatnonzero(array_labels != 0)
+        array_dist, array_nearest = cKDTree(cities[array_rest]).query(cities[array_component])
+        nearest_idx = int(np.argmin(array_dist))
+        city_1, city_2 = int(array_component[nearest_idx]), int(array_rest[array_nearest[nearest_idx]])
+        list_edges.append((city_1, city_2))
+        array_labels[array_labels == array_labels[city_2]] = 0
+        num_of_components -= 1
+    return list_edges
+
+
+def greedy_matching(cities: np.array, array_odd: np.array) -> list:
+    # pairs of the nearest cities of odd degree are matched from the shortest one
+    list_matching = []
+    array_matched = np.zeros(cities.shape[0], dtype=bool)
+    if array_odd.shape[0] > 1:
+        array_from, array_to, array_length = candidate_edges(cities[array_odd])
+        for idx in np.argsort(array_length, kind='stable').tolist():
+            city_1, city_2 = int(array_odd[array_from[idx]]), int(array_odd[array_to[idx]])
+            if not array_matched[city_1] and not array_matched[city_2]:
+                array_matched[city_1] = array_matched[city_2] = True
+                list_matching.append((city_1, city_2))
+    # cities without matched neighbour are matched by nearest neighbour rule
+    list_left = [int(city) for city in array_odd if not array_matched[city]]
+    while list_left:
+        city = list_left.pop()
+        array_left = np.array(list_left)
+        nearest_idx = int(np.argmin(np.hypot(*(cities[array_left] - cities[city]).T)))
+        list_matching.append((city, list_left.pop(nearest_idx)))
+    return list_matching
+
+
+# construction heuristics returning path with return to the starting city
+DICT_INITIALIZATIONS = {'nearest_neighbour': nearest_neighbour,
+                        'greedy': greedy_edge,
+                        'space_filling_curve': space_filling_curve,
+                        'christofides': christofides}
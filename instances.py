@@ -0,0 +1,281 @@
+import hashlib
+import math
+import os
+import numpy as np
+from typing import Tuple
+
+# version of the cache files, changing it makes old cache files unused
+CACHE_VERSION = 1
+# number of elements of distance matrix calculated at once
+BLOCK_ELEMENTS = 2 ** 22
+# radius of the Earth used by GEO distances
+EARTH_RADIUS = 6378.388
+
+
+def load_instance(path: str,
+                  cache_dir: str = None,
+                  with_distance_matrix: bool = True,
+                  dtype: type = np.float64) -> Tuple[np.array, np.array]:
+    """
+    Load cities and distances between them. Supported are TSPLIB files (.tsp), numpy files (.npy) with 2D array
+    of cities and text files with two rows of coordinates. Parsed cities and distance matrix can be cached as
+    .npy files, which are opened memory mapped, so next runs (and worker processes) do not parse the file and
+    do not calculate the matrix again.
+
+    :param path: path to the file with the instance
+    :param cache_dir: directory with cache files (cache is not used if not given)
+    :param with_distance_matrix: if False distance matrix is not calculated (None is returned)
+    :param dtype: type of the distance matrix elements, np.float32 halves the memory used by the matrix
+    :return: 2D numpy array of cities and distance matrix (EXPLICIT TSPLIB instances need DISPLAY_DATA_SECTION,
+    because the algorithms use coordinates of the cities)
+    """
+    if cache_dir is None:
+        instance = read_instance(path)
+        check_cities(instance, path)
+        distance_matrix = None
+        if with_distance_matrix:
+            distance_matrix = instance['distance_matrix']
+            if distance_matrix is None:
+                distance_matrix = calc_instance_distances(instance['cities'], instance['edge_weight_type'],
+                                                          dtype)
+            distance_matrix = np.ascontiguousarray(distance_matrix, dtype=dtype)
+        return instance['cities'], distance_matrix
+
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_prefix = os.path.join(cache_dir, cache_key(path))
+    cities_file = cache_prefix + '-cities.npy'
+    distances_file = cache_prefix + f'-distances-{np.dtype(dtype).name}.npy'
+    has_cities = os.path.exists(cities_file)
+    has_distances = os.path.exists(distances_file) or not with_distance_matrix
+
+    if not (has_cities and has_distances):
+        instance = read_instance(path)
+        check_cities(instance, path)
+        if not has_cities:
+            save_array(cities_file, instance['cities'])
+        if with_distance_matrix and not os.path.exists(distances_file):
+            if instance['distance_matrix'] is not None:
+                save_array(distances_file, instance['distance_matrix'].astype(dtype))
+            else:
+                write_distance_matrix(distances_file, instance['cities'], instance['edge_weight_type'], dtype)
+
+    cities = np.load(cities_file, mmap_mode='r')
+    distance_matrix = np.load(distances_file, mmap_mode='r') if with_distance_matrix else None
+    return cities, distance_matrix
+
+
+def check_cities(instance: dict, path: str) -> None:
+    # candidate lists, construction heuristics and the number of cities are taken from coordinates
+    if instance['cities'] is None:
+        raise ValueError(f"Instance '{path}' has only explicit distances, coordinates of the cities "
+                         f"(NODE_COORD_SECTION or DISPLAY_DATA_SECTION) are needed by the algorithms")
+
+
+def read_instance(path: str) -> dict:
+    # choose reader by the file extension
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.tsp':
+        return read_tsplib(path)
+    if extension == '.npy':
+        cities = np.load(path)
+    else:
+        # text file with the first row of x coordinates and the second row of y coordinates
+        cities = np.loadtxt(path).T
+    return {'name': os.path.basename(path), 'dimension': cities.shape[0], 'edge_weight_type': 'EUCLIDEAN',
+            'cities': np.ascontiguousarray(cities, dtype=np.float64), 'distance_matrix': None}
+
+
+def read_tsplib(path: str) -> dict:
+    """
+    Read symmetric TSPLIB instance. File is read line by line and data is written directly into preallocated
+    arrays, so the whole file is never kept in memory.
+
+    :param path: path to the .tsp file
+    :return: dictionary with name, dimension, edge_weight_type, cities (2D numpy array or None) and
+    distance_matrix (2D numpy array for EXPLICIT instances, None otherwise)
+    """
+    dict_header = {}
+    cities = None
+    distance_matrix = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line == 'EOF':
+                break
+            if ':' in line:
+                key, value = line.split(':', 1)
+                dict_header[key.strip().upper()] = value.strip()
+                continue
+            section = line.upper()
+            dimension = int(dict_header['DIMENSION'])
+            if section in ('NODE_COORD_SECTION', 'DISPLAY_DATA_SECTION'):
+                array_coordinates = read_coordinates(f, dimension)
+                # coordinates of explicit instance are used only when there are no others
+                if cities is None or section == 'NODE_COORD_SECTION':
+                    cities = array_coordinates
+            elif section == 'EDGE_WEIGHT_SECTION':
+                distance_matrix = read_edge_weights(f, dimension, dict_header.get('EDGE_WEIGHT_FORMAT', ''))
+            else:
+                raise ValueError(f"Unsupported TSPLIB section '{line}'")
+
+    problem_type = dict_header.get('TYPE', 'TSP').split()[0]
+    if problem_type != 'TSP':
+        raise ValueError(f"Unsupported TSPLIB problem type '{problem_type}'")
+    edge_weight_type = dict_header.get('EDGE_WEIGHT_TYPE', 'EUC_2D')
+    if edge_weight_type != 'EXPLICIT' and edge_weight_type not in DICT_EDGE_WEIGHTS:
+        raise ValueError(f"Unknown edge weight type '{edge_weight_type}', use one of: EXPLICIT, "
+                         f"{', '.join(DICT_EDGE_WEIGHTS)}")
+    if edge_weight_type == 'EXPLICIT' and distance_matrix is None:
+        raise ValueError('EXPLICIT instance without EDGE_WEIGHT_SECTION')
+    if edge_weight_type != 'EXPLICIT' and cities is None:
+        raise ValueError('Instance without NODE_COORD_SECTION')
+    return {'name': dict_header.get('NAME', os.path.basename(path)), 'dimension': int(dict_header['DIMENSION']),
+            'edge_weight_type': edge_weight_type, 'cities': cities, 'distance_matrix': distance_matrix}
+
+
+def read_coordinates(f, dimension: int) -> np.array:
+    # each line contains number of the node (starting from 1) and its coordinates
+    cities = np.empty((dimension, 2))
+    for _ in range(dimension):
+        node, x, y = f.readline().split()[:3]
+        cities[int(node) - 1] = float(x), float(y)
+    return cities
+
+
+def read_edge_weights(f, dimension: int, edge_weight_format: str) -> np.array:
+    # weights can be split into lines in any way, so numbers are read until all of them are found
+    if edge_weight_format not in DICT_WEIGHT_FORMATS:
+        raise ValueError(f"Unknown edge weight format '{edge_weight_format}', use one of: "
+                         f"{', '.join(DICT_WEIGHT_FORMATS)}")
+    num_of_weights = DICT_WEIGHT_FORMATS[edge_weight_format](dimension)
+    array_weights = np.empty(num_of_weights)
+    num_of_read = 0
+    while num_of_read < num_of_weights:
+        line = f.readline()
+        if not line:
+            raise ValueError('Unexpected end of EDGE_WEIGHT_SECTION')
+        array_line = np.array(line.split(), dtype=np.float64)
+        array_weights[num_of_read:num_of_read + array_line.shape[0]] = array_line
+        num_of_read += array_line.shape[0]
+
+    if edge_weight_format == 'FULL_MATRIX':
+        return array_weights.reshape(dimension, dimension)
+    # triangular formats are filled row by row, transposed lower triangle is the upper one
+    distance_matrix = np.zeros((dimension, dimension))
+    with_diagonal = 'DIAG' in edge_weight_format
+    if edge_weight_format.startswith('UPPER'):
+        array_rows, array_cols = np.triu_indices(dimension, 0 if with_diagonal else 1)
+    else:
+        array_rows, array_cols = np.tril_indices(dimension, 0 if with_diagonal else -1)
+    distance_matrix[array_rows, array_cols] = array_weights
+    distance_matrix[array_cols, array_rows] = array_weights
+    return distance_matrix
+
+
+def calc_instance_distances(cities: np.array, edge_weight_type: str, dtype: type = np.float64,
+                            array_rows: np.array = None) -> np.array:
+    """
+    Calculate distances between cities as defined by the instance
+
+    :param cities: 2D numpy array of cities
+    :param edge_weight_type: TSPLIB edge weight type (key of DICT_EDGE_WEIGHTS)
+    :param dtype: type of the matrix elements
+    :param array_rows: calculate only rows of these cities (all rows if not given)
+    :return: 2D numpy array of distances
+    """
+    if array_rows is None:
+        array_rows = np.arange(cities.shape[0])
+    distance_matrix = np.empty((array_rows.shape[0], cities.shape[0]), dtype=dtype)
+    # rows are calculated in blocks, so temporary arrays are small
+    rows_in_block = max(1, BLOCK_ELEMENTS // max(cities.shape[0], 1))
+    for start in range(0, array_rows.shape[0], rows_in_block):
+        array_block = array_rows[start:start + rows_in_block]
+        distance_matrix[start:start + rows_in_block] = \
+            DICT_EDGE_WEIGHTS[edge_weight_type](cities[array_block][:, None], cities[None, :])
+    distance_matrix[np.arange(array_rows.shape[0]), array_rows] = 0
+    return distance_matrix
+
+
+def write_distance_matrix(path: str, cities: np.array, edge_weight_type: str, dtype: type = np.float64) -> None:
+    # matrix is calculated in blocks of rows written directly to memory mapped file, so only one block
+    # is kept in memory
+    num_of_cities = cities.shape[0]
+    rows_in_block = max(1, BLOCK_ELEMENTS // max(num_of_cities, 1))
+    temporary_path = path + '.tmp.npy'
+    distance_matrix = np.lib.format.open_memmap(temporary_path, mode='w+', dtype=dtype,
+                                                shape=(num_of_cities, num_of_cities))
+    for start in range(0, num_of_cities, rows_in_block):
+        end = min(start + rows_in_block, num_of_cities)
+        distance_matrix[start:end] = calc_instance_distances(cities, edge_weight_type, dtype,
+                                                             np.arange(start, end))
+    distance_matrix.flush()
+    del distance_matrix
+    os.replace(temporary_path, path)
+
+
+def save_array(path: str, array: np.array) -> None:
+    # file is renamed after writing, so other processes never see partially written file
+    temporary_path = path + '.tmp.npy'
+    np.save(temporary_path, array)
+    os.replace(temporary_path, path)
+
+
+def cache_key(path: str) -> str:
+    # cache files are identified by the name, size and modification time of the instance file
+    stat = os.stat(path)
+    description = f'{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{CACHE_VERSION}'
+    name = os.path.splitext(os.path.basename(path))[0]
+    return f'{name}-{hashlib.sha1(description.encode()).hexdigest()[:16]}'
+
+
+# distance functions take two arrays of coordinates (last dimension of size 2) and return distances between
+# their corresponding cities, arrays are broadcast, so they can give single distances as well as matrices
+def euclidean_distances(array_a: np.array, array_b: np.array) -> np.array:
+    return np.hypot(array_a[..., 0] - array_b[..., 0], array_a[..., 1] - array_b[..., 1])
+
+
+def euc_2d_distances(array_a: np.array, array_b: np.array) -> np.array:
+    # euclidean distance rounded to the nearest integer
+    return np.floor(euclidean_distances(array_a, array_b) + 0.5)
+
+
+def ceil_2d_distances(array_a: np.array, array_b: np.array) -> np.array:
+    return np.ceil(euclidean_distances(array_a, array_b))
+
+
+def att_distances(array_a: np.array, array_b: np.array) -> np.array:
+    # pseudo-euclidean distance, rounded up when rounding to the nearest integer gives smaller value
+    array_r = euclidean_distances(array_a, array_b) / math.sqrt(10)
+    array_t = np.floor(array_r + 0.5)
+    return np.where(array_t < array_r, array_t + 1, array_t)
+
+
+def geo_distances(array_a: np.array, array_b: np.array) -> np.array:
+    # coordinates are given as DDD.MM (degrees and minutes) of latitude and longitude
+    def to_radians(array_coordinates: np.array) -> np.array:
+        array_degrees = np.trunc(array_coordinates)
+        return math.pi * (array_degrees + 5 * (array_coordinates - array_degrees) / 3) / 180
+
+    array_a_rad, array_b_rad = to_radians(np.asarray(array_a)), to_radians(np.asarray(array_b))
+    q1 = np.cos(array_a_rad[..., 1] - array_b_rad[..., 1])
+    q2 = np.cos(array_a_rad[..., 0] - array_b_rad[..., 0])
+    q3 = np.cos(array_a_rad[..., 0] + array_b_rad[..., 0])
+    array_arg = np.clip(0.5 * ((1 + q1) * q2 - (1 - q1) * q3), -1, 1)
+    return np.trunc(EARTH_RADIUS * np.arccos(array_arg) + 1)
+
+
+# functions calculating distances between pairs of cities
+DICT_EDGE_WEIGHTS = {'EUCLIDEAN': euclidean_distances,
+                     'EUC_2D': euc_2d_distances,
+                     'CEIL_2D': ceil_2d_distances,
+                     'ATT': att_distances,
+                     'GEO': geo_distances}
+
+# functions returning number of weights given in EDGE_WEIGHT_SECTION
+DICT_WEIGHT_FORMATS = {'FULL_MATRIX': lambda dimension: dimension * dimension,
+                       'UPPER_ROW': lambda dimension: dimension * (dimension - 1) // 2,
+                       'LOWER_ROW': lambda dimension: dimension * (dimension - 1) // 2,
+                       'UPPER_DIAG_ROW': lambda dimension: dimension * (dimension + 1) // 2,
+                       'LOWER_DIAG_ROW': lambda dimension: dimension * (dimension + 1) // 2}
@@ -0,0 +1,63 @@
+import time
+from collections import defaultdict
+
+
+class Instrumentation:
+    """
+    Statistics collected inside the algorithm: time spent in each phase, counters of events (also hits and
+    misses of watched caches) and convergence trace. Algorithms take it as an optional argument and check for
+    None before each use, so without instrumentation they do not pay for collecting statistics. The object is
+    filled during the run and can be read (or summarized) after it, algorithms can also return its summary
+    together with the result (return_statistics argument).
+
+    :param trace_every: trace is recorded every trace_every iterations (tours, generations, moves or steps)
+    """
+    def __init__(self, trace_every: int = 1):
+        self.trace_every = trace_every
+        self.dict_timers = defaultdict(float)
+        self.dict_counters = defaultdict(int)
+        self.list_trace = []
+        self.dict_caches = {}
+        self.last_lap = time.perf_counter()
+
+    def start_laps(self) -> None:
+        # the next lap is measured from now
+        self.last_lap = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        # time from the previous lap is added to the phase, so consecutive phases need one call each
+        now = time.perf_counter()
+        self.dict_timers[phase] += now - self.last_lap
+        self.last_lap = now
+
+    def count(self, counter: str, value: int = 1) -> None:
+        self.dict_counters[counter] += value
+
+    def watch_cache(self, name: str, cache) -> None:
+        # hits and misses of the cache made from now on are added to counters by summary, objects without
+        # hits and misses attributes (like numpy arrays) are skipped, so any distance matrix can be given
+        if hasattr(cache, 'hits') and hasattr(cache, 'misses'):
+            self.dict_caches[name] = (cache, cache.hits, cache.misses)
+
+    def trace(self, iteration: int, **values) -> None:
+        # values are recorded only every trace_every iterations
+        if iteration % self.trace_every == 0:
+            self.list_trace.append({'iteration': iteration, **values})
+
+    def summary(self) -> dict:
+        """
+        Summarize collected statistics
+
+        :return: dictionary with timers (seconds spent in each phase), share of each phase in the measured time,
+        counters (with name_hits and name_misses of each watched cache) and trace (list of dictionaries)
+        """
+        total_time = sum(self.dict_timers.values())
+        dict_counters = dict(self.dict_counters)
+        for name, (cache, start_hits, start_misses) in self.dict_caches.items():
+            dict_counters[f'{name}_hits'] = cache.hits - start_hits
+            dict_counters[f'{name}_misses'] = cache.misses - start_misses
+        return {'timers': dict(self.dict_timers),
+                'shares': {phase: phase_time / total_time if total_time > 0 else 0.0
+                           for phase, phase_time in self.dict_timers.items()},
+                'counters': dict_counters,
+                'trace': list(self.list_trace)}
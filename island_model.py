@@ -0,0 +1,189 @@
+import numpy as np
+import multiprocessing
+import queue
+import time
+from typing import List, Tuple
+from distances import calc_distance_matrix
+from candidates import candidate_lists
+from local_search import NUM_OF_CANDIDATES
+from shared_arrays import share_or_map, attach_array, release_shared
+from seeding import spawn_seeds, seed_generators
+from genetic_algorithm import DICT_SELECTIONS, DICT_CROSSOVERS, create_initial_population, evaluate_cost, \
+    create_crossover_buffers, next_generation, best_indexes, best_of_population, number_of_parents
+
+
+def island_genetic_algorithm(cities: np.array,
+                             num_of_islands: int,
+                             population_size: int,
+                             num_of_iter: int,
+                             n: float,
+                             mutation_probability: float,
+                             selection: str,
+                             migration_interval: int = 10,
+                             migration_size: int = 2,
+                             topology: str = 'ring',
+                             distance_matrix: np.array = None,
+                             crossover: str = 'cx',
+                             use_local_search: bool = False,
+                             base_seed: int = 0) -> Tuple[float, list, List[dict]]:
+    """
+    Solving Traveling Salesman Problem using island model of Genetic Algorithm. Each island evolves its own
+    population in separate process and every migration_interval generations sends copies of its best paths
+    to neighbouring islands, where they replace the worst paths.
+
+    :param cities: 2D numpy array of cities
+    :param num_of_islands: number of populations (and processes)
+    :param population_size: population of each island
+    :param num_of_iter: number of generations on each island
+    :param n: parent to population population size ratio (not used by "kbest" selection, which takes
+    the whole population as parents)
+    :param mutation_probability: probability of population element mutation
+    :param selection: selection algorithm (key of genetic_algorithm.DICT_SELECTIONS)
+    :param migration_interval: number of generations between migrations
+    :param migration_size: number of paths sent by island during one migration
+    :param topology: islands receiving migrants. Can obtain two values: "ring" (the next island)
+    or "fully_connected" (all other islands)
+    :param distance_matrix: precomputed distances between cities (calculated from cities if not given)
+    :param crossover: crossover operator (key of genetic_algorithm.DICT_CROSSOVERS)
+    :param use_local_search: if True each offspring is improved with 2-opt and Or-opt local search
+    :param base_seed: seed from which independent seed of each island is derived
+    :return: best score (as an float), best route (indexes of the cities) found on all islands and list of
+    statistics of each island
+    """
+    if selection not in DICT_SELECTIONS:
+        raise ValueError(f"Unknown selection '{selection}', use one of: {', '.join(DICT_SELECTIONS)}")
+    if crossover not in DICT_CROSSOVERS:
+        raise ValueError(f"Unknown crossover '{crossover}', use one of: {', '.join(DICT_CROSSOVERS)}")
+    if topology not in DICT_TOPOLOGIES:
+        raise ValueError(f"Unknown topology '{topology}', use one of: {', '.join(DICT_TOPOLOGIES)}")
+    if distance_matrix is None:
+        distance_matrix = calc_distance_matrix(cities)
+    migration_size = min(migration_size, population_size)
+
+    dict_parameters = {'population_size': population_size, 'num_of_iter': num_of_iter,
+                       'num_of_parents': number_of_parents(selection, n, population_size),
+                       'mutation_probability': mutation_probability,
+                       'selection': selection, 'crossover': crossover, 'use_local_search': use_local_search,
+                       'migration_interval': migration_interval, 'migration_size': migration_size}
+    list_seeds = spawn_seeds(base_seed, num_of_islands)
+    list_targets = DICT_TOPOLOGIES[topology](num_of_islands)
+
+    # data is copied to shared memory once, migrants are sent through queues
+    shm_cities, cities_description = share_or_map(cities)
+    shm_distance_matrix, distance_matrix_description = share_or_map(distance_matrix)
+    list_inboxes = [multiprocessing.Queue() for _ in range(num_of_islands)]
+    result_queue = multiprocessing.Queue()
+    list_processes = []
+    try:
+        for island_idx in range(num_of_islands):
+            list_outboxes = [list_inboxes[target] for target in list_targets[island_idx]]
+            num_of_sources = sum(island_idx in targets for targets in list_targets)
+            process = multiprocessing.Process(target=run_island,
+                                              args=(island_idx, dict_parameters, list_seeds[island_idx],
+                                                    cities_description, distance_matrix_description,
+                                                    list_inboxes[island_idx], list_outboxes, num_of_sources,
+                                                    result_queue))
+            process.start()
+            list_processes.append(process)
+
+        list_results = []
+        while len(list_results) < num_of_islands:
+            try:
+                list_results.append(result_queue.get(timeout=1))
+            except queue.Empty:
+                # stop waiting if any island failed
+                if any(process.exitcode not in (None, 0) for process in list_processes):
+                    raise RuntimeError('Island process failed')
+        for process in list_processes:
+            process.join()
+    finally:
+        for process in list_processes:
+            if process.is_alive():
+                process.terminate()
+        release_shared([shm_cities, shm_distance_matrix])
+
+    list_results.sort(key=lambda result: result[0])
+    list_statistics = [statistics for _, _, _, statistics in list_results]
+    _, best_score, best_path, _ = min(list_results, key=lambda result: result[1])
+    return best_score, best_path, list_statistics
+
+
+def run_island(island_idx: int,
+               dict_parameters: dict,
+               seed: int,
+               cities_description: tuple,
+               distance_matrix_description: tuple,
+               inbox: multiprocessing.Queue,
+               list_outboxes: list,
+               num_of_sources: int,
+               result_queue: multiprocessing.Queue) -> None:
+    start_time = time.perf_counter()
+    seed_generators(seed)
+    shm_cities, cities = attach_array(cities_description)
+    shm_distance_matrix, distance_matrix = attach_array(distance_matrix_description)
+    try:
+        num_of_cities = cities.shape[0]
+        population_size = dict_parameters['population_size']
+        migration_interval = dict_parameters['migration_interval']
+        migration_size = dict_parameters['migration_size']
+        selection_function = DICT_SELECTIONS[dict_parameters['selection']]
+        array_offsprings = np.empty((dict_parameters['num_of_parents'], num_of_cities), dtype=np.int64)
+        dict_buffers = create_crossover_buffers(num_of_cities)
+        array_candidates = None
+        if dict_parameters['use_local_search']:
+            array_candidates = candidate_lists(cities, NUM_OF_CANDIDATES)
+
+        array_population = create_initial_population(population_size, num_of_cities)
+        array_fitness = evaluate_cost(array_population, distance_matrix)
+        num_of_evaluations = population_size
+        migrants_received = 0
+        for generation in range(1, dict_parameters['num_of_iter'] + 1):
+            array_population, array_fitness = next_generation(array_population, array_fitness, array_offsprings,
+                                                              distance_matrix, selection_function,
+                                                              dict_parameters['mutation_probability'],
+                                                              dict_parameters['crossover'], dict_buffers,
+                                                              array_candidates)
+            num_of_evaluations += array_offsprings.shape[0]
+
+            if generation % migration_interval == 0 and generation < dict_parameters['num_of_iter']:
+                # send copies of the best paths to neighbours
+                array_emigrants = array_population[best_indexes(array_fitness, migration_size)]
+                for outbox in list_outboxes:
+                    outbox.put(array_emigrants)
+                # migrants from each source island replace the worst paths
+                for _ in range(num_of_sources):
+                    array_immigrants = inbox.get()
+                    array_worst_idx = best_indexes(-array_fitness, array_immigrants.shape[0])
+                    array_population[array_worst_idx] = array_immigrants
+                    array_fitness[array_worst_idx] = evaluate_cost(array_immigrants, distance_matrix)
+                    migrants_received += array_immigrants.shape[0]
+
+        best_score, best_path = best_of_population(array_population, array_fitness)
+        statistics = {'island': island_idx, 'best_score': best_score, 'mean_score': float(array_fitness.mean()),
+                      'generations': dict_parameters['num_of_iter'], 'evaluations': num_of_evaluations,
+                      'migrants_received': migrants_received, 'time': time.perf_counter() - start_time}
+        result_queue.put((island_idx, best_score, best_path, statistics))
+    finally:
+        # arrays using shared memory have to be removed before closing it
+        del cities, distance_matrix
+        for shm in (shm_cities, shm_distance_matrix):
+            if shm is not None:
+                shm.close()
+
+
+def ring_topology(num_of_islands: int) -> List[list]:
+    # each island sends migrants to the next one
+    if num_of_islands < 2:
+        return [[]]
+    return [[(island_idx + 1) % num_of_islands] for island_idx in range(num_of_islands)]
+
+
+def fully_connected_topology(num_of_islands: int) -> List[list]:
+    # each island sends migrants to all other islands
+    return [[target for target in range(num_of_islands) if target != island_idx]
+            for island_idx in range(num_of_islands)]
+
+
+# functions returning list of islands receiving migrants from each island
+DICT_TOPOLOGIES = {'ring': ring_topology,
+                   'fully_connected': fully_connected_topology}
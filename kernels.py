@@ -0,0 +1,279 @@
+import os
+import numpy as np
+
+# kernels are compiled with numba when it is installed, otherwise the algorithms use their numpy/python
+# implementations, which give the same results (TSP_KERNELS=python forces them also when numba is installed)
+try:
+    if os.environ.get('TSP_KERNELS', '').lower() == 'python':
+        raise ImportError('compiled kernels disabled by TSP_KERNELS')
+    from numba import njit
+    USE_NUMBA = True
+except ImportError:
+    USE_NUMBA = False
+
+    def njit(**kwargs):
+        # without numba kernels stay plain python functions
+        return lambda function: function
+
+# improvements of local search smaller than that are treated as rounding errors (also used by local_search)
+EPSILON = 1e-10
+
+
+@njit(cache=True)
+def roulette_choice(array_step_weights: np.array,
+                    array_visited: np.array,
+                    array_sum: np.array,
+                    array_rand: np.array,
+                    array_exploit_rand: np.array,
+                    q0: float) -> np.array:
+    """
+    Choose next city of each ant with the roulette wheel, the same operations as in ant_system.where_to_go
+    are made for each row, so rounding errors are also the same
+
+    :param array_step_weights: 2D numpy array of weights (float64) of going to each city
+    :param array_visited: 2D numpy array of visited cities of each ant
+    :param array_sum: sum of weights of each ant (greater than 0)
+    :param array_rand: random number of each ant drawn from [0, 1)
+    :param array_exploit_rand: random number of each ant deciding about exploitation (used if q0 > 0)
+    :param q0: probability of going to the city of the highest weight instead of drawing it
+    :return: 1D numpy array with chosen city of each ant
+    """
+    num_of_ants, num_of_cities = array_step_weights.shape
+    array_cities = np.empty(num_of_ants, dtype=np.int64)
+    for ant_idx in range(num_of_ants):
+        array_row = array_step_weights[ant_idx]
+        # rows are shifted by the ant number like in the single sorted array searched by numpy
+        rand = array_rand[ant_idx] + ant_idx
+        cumulative_sum = 0.
+        chosen_city = num_of_cities - 1
+        for city in range(num_of_cities):
+            cumulative_sum += array_row[city]
+            if cumulative_sum / array_sum[ant_idx] + ant_idx > rand:
+                chosen_city = city
+                break
+        # rounding errors could point to the visited city, then the most probable one is chosen
+        if array_visited[ant_idx, chosen_city]:
+            chosen_city = np.argmax(array_row)
+        if q0 > 0 and array_exploit_rand[ant_idx] < q0:
+            chosen_city = np.argmax(array_row)
+        array_cities[ant_idx] = chosen_city
+    return array_cities
+
+
+@njit(cache=True)
+def cycle_crossover_kernel(parent_1: np.array,
+                           parent_2: np.array,
+                           offspring: np.array,
+                           array_position: np.array,
+                           array_mask: np.array) -> None:
+    # positions of the cycle starting at the first position are taken from the first parent,
+    # other from the second one
+    num_of_cities = parent_1.shape[0]
+    for idx in range(num_of_cities):
+        array_position[parent_1[idx]] = idx
+        array_mask[idx] = False
+    array_mask[0] = True
+    position = array_position[parent_2[0]]
+    while position != 0:
+        array_mask[position] = True
+        position = array_position[parent_2[position]]
+    for idx in range(num_of_cities):
+        offspring[idx] = parent_1[idx] if array_mask[idx] else parent_2[idx]
+
+
+@njit(cache=True)
+def order_crossover_kernel(parent_1: np.array,
+                           parent_2: np.array,
+                           offspring: np.array,
+                           array_in_segment: np.array,
+                           cut_1: int,
+                           cut_2: int) -> None:
+    # segment is copied from the first parent, other positions (starting after the second cut point)
+    # get the remaining cities in the order they appear in the second parent
+    num_of_cities = parent_1.shape[0]
+    array_in_segment[:] = False
+    for idx in range(cut_1, cut_2):
+        offspring[idx] = parent_1[idx]
+        array_in_segment[parent_1[idx]] = True
+    position = cut_2
+    for idx in range(num_of_cities):
+        city = parent_2[(cut_2 + idx) % num_of_cities]
+        if not array_in_segment[city]:
+            if position == num_of_cities:
+                position = 0
+            offspring[position] = city
+            position += 1
+
+
+@njit(cache=True)
+def local_search_kernel(array_path: np.array,
+                        distance_matrix: np.array,
+                        array_candidates: np.array,
+                        or_opt: bool) -> None:
+    """
+    Improve path in place with 2-opt and Or-opt moves, the moves are checked in the same order as in
+    local_search.local_search, so the same local optimum is found
+
+    :param array_path: 1D numpy array with path without return to the starting city
+    :param distance_matrix: 2D numpy array of distances between cities
+    :param array_candidates: 2D numpy array with nearest neighbours of each city sorted from the nearest one
+    :param or_opt: if False only 2-opt moves are used
+    """
+    num_of_cities = array_path.shape[0]
+    array_position = np.empty(num_of_cities, dtype=np.int64)
+    for idx in range(num_of_cities):
+        array_position[array_path[idx]] = idx
+
+    # cities with cleared don't-look bit waiting for the check (circular buffer, each city is there once)
+    array_queue = array_path.copy()
+    queue_start, queue_len = 0, num_of_cities
+    array_in_queue = np.ones(num_of_cities, dtype=np.bool_)
+    array_changed = np.empty(6, dtype=np.int64)
+    while queue_len > 0:
+        city = array_queue[queue_start]
+        queue_start = (queue_start + 1) % num_of_cities
+        queue_len -= 1
+        array_in_queue[city] = False
+        num_of_changed = improve_two_opt_kernel(array_path, array_position, distance_matrix,
+                                                array_candidates[city], city, array_changed)
+        if num_of_changed == 0 and or_opt:
+            num_of_changed = improve_or_opt_kernel(array_path, array_position, distance_matrix,
+                                                   array_candidates[city], city, array_changed)
+        # clear don't-look bits of the cities at the ends of changed arcs
+        for changed_idx in range(num_of_changed):
+            changed_city = array_changed[changed_idx]
+            if not array_in_queue[changed_city]:
+                array_in_queue[changed_city] = True
+                array_queue[(queue_start + queue_len) % num_of_cities] = changed_city
+                queue_len += 1
+
+
+@njit(cache=True)
+def improve_two_opt_kernel(array_path: np.array, array_position: np.array, distance_matrix: np.array,
+                           array_neighbours: np.array, city: int, array_changed: np.array) -> int:
+    num_of_cities = array_path.shape[0]
+    idx = array_position[city]
+    for direction in (1, -1):
+        next_city = array_path[(idx + direction) % num_of_cities]
+        dist_removed = distance_matrix[city, next_city]
+        for neighbour in array_neighbours:
+            dist_added = distance_matrix[city, neighbour]
+            if dist_added >= dist_removed:
+                break
+            neighbour_next = array_path[(array_position[neighbour] + direction) % num_of_cities]
+            if neighbour_next == city or neighbour == next_city:
+                continue
+            delta = dist_added + distance_matrix[next_city, neighbour_next] - dist_removed - \
+                distance_matrix[neighbour, neighbour_next]
+            if delta < -EPSILON:
+                if direction == 1:
+                    reverse_segment_kernel(array_path, array_position, array_position[next_city],
+                                           array_position[neighbour])
+                else:
+                    reverse_segment_kernel(array_path, array_position, array_position[neighbour],
+                                           array_position[next_city])
+                array_changed[0] = city
+                array_changed[1] = next_city
+                array_changed[2] = neighbour
+                array_changed[3] = neighbour_next
+                return 4
+    return 0
+
+
+@njit(cache=True)
+def improve_or_opt_kernel(array_path: np.array, array_position: np.array, distance_matrix: np.array,
+                          array_neighbours: np.array, city: int, array_changed: np.array) -> int:
+    num_of_cities = array_path.shape[0]
+    idx = array_position[city]
+    for segment_len in range(1, 4):
+        segment_first = city
+        segment_last = array_path[(idx + segment_len - 1) % num_of_cities]
+        prev_city = array_path[(idx - 1) % num_of_cities]
+        next_city = array_path[(idx + segment_len) % num_of_cities]
+        if next_city == prev_city:
+            break
+        gain_removal = distance_matrix[prev_city, segment_first] + distance_matrix[segment_last, next_city] - \
+            distance_matrix[prev_city, next_city]
+        if gain_removal <= EPSILON:
+            continue
+        for neighbour in array_neighbours:
+            if distance_matrix[segment_first, neighbour] >= gain_removal:
+                break
+            if in_segment(array_path, idx, segment_len, neighbour):
+                continue
+            neighbour_idx = array_position[neighbour]
+            for side in range(2):
+                if side == 0:
+                    before_city, after_city = neighbour, array_path[(neighbour_idx + 1) % num_of_cities]
+                else:
+                    before_city, after_city = array_path[(neighbour_idx - 1) % num_of_cities], neighbour
+                if in_segment(array_path, idx, segment_len, before_city) or \
+                        in_segment(array_path, idx, segment_len, after_city):
+                    continue
+                dist_arc = distance_matrix[before_city, after_city]
+                cost_keep = distance_matrix[before_city, segment_first] + \
+                    distance_matrix[segment_last, after_city] - dist_arc
+                cost_reverse = distance_matrix[before_city, segment_last] + \
+                    distance_matrix[segment_first, after_city] - dist_arc
+                if min(cost_keep, cost_reverse) - gain_removal < -EPSILON:
+                    move_segment_kernel(array_path, array_position, idx, segment_len, before_city,
+                                        cost_reverse < cost_keep)
+                    array_changed[0] = prev_city
+                    array_changed[1] = next_city
+                    array_changed[2] = before_city
+                    array_changed[3] = after_city
+                    array_changed[4] = segment_first
+                    array_changed[5] = segment_last
+                    return 6
+    return 0
+
+
+@njit(cache=True)
+def in_segment(array_path: np.array, start: int, segment_len: int, city: int) -> bool:
+    # segment has at most 3 cities, so they are checked one by one instead of using a set
+    for i in range(segment_len):
+        if array_path[(start + i) % array_path.shape[0]] == city:
+            return True
+    return False
+
+
+@njit(cache=True)
+def reverse_segment_kernel(array_path: np.array, array_position: np.array, start: int, end: int) -> None:
+    # the shorter of the segment and the rest of the path is reversed
+    num_of_cities = array_path.shape[0]
+    segment_len = (end - start) % num_of_cities + 1
+    if 2 * segment_len > num_of_cities:
+        start, end = (end + 1) % num_of_cities, (start - 1) % num_of_cities
+        segment_len = num_of_cities - segment_len
+    for i in range(segment_len // 2):
+        idx_1 = (start + i) % num_of_cities
+        idx_2 = (end - i) % num_of_cities
+        city_1, city_2 = array_path[idx_1], array_path[idx_2]
+        array_path[idx_1], array_path[idx_2] = city_2, city_1
+        array_position[city_2], array_position[city_1] = idx_1, idx_2
+
+
+@njit(cache=True)
+def move_segment_kernel(array_path: np.array, array_position: np.array, start: int, segment_len: int,
+                        before_city: int, reverse: bool) -> None:
+    # path is rotated, so the segment is at the beginning, then the segment is inserted after before_city
+    num_of_cities = array_path.shape[0]
+    array_rotated = np.empty(num_of_cities, dtype=array_path.dtype)
+    for idx in range(num_of_cities):
+        array_rotated[idx] = array_path[(start + idx) % num_of_cities]
+    insert_idx = segment_len
+    while array_rotated[insert_idx] != before_city:
+        insert_idx += 1
+    insert_idx += 1 - segment_len
+    idx = 0
+    for rest_idx in range(segment_len, segment_len + insert_idx):
+        array_path[idx] = array_rotated[rest_idx]
+        idx += 1
+    for segment_idx in range(segment_len):
+        array_path[idx] = array_rotated[segment_len - 1 - segment_idx if reverse else segment_idx]
+        idx += 1
+    for rest_idx in range(segment_len + insert_idx, num_of_cities):
+        array_path[idx] = array_rotated[rest_idx]
+        idx += 1
+    for idx in range(num_of_cities):
+        array_position[array_path[idx]] = idx
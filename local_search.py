@@ -0,0 +1,160 @@
+import numpy as np
+from collections import deque
+from typing import Tuple
+from distances import tour_length
+from kernels import USE_NUMBA, EPSILON, local_search_kernel
+
+# number of nearest neighbours used by local search when candidate lists were not given
+NUM_OF_CANDIDATES = 10
+
+
+def local_search(path: list,
+                 distance_matrix: np.array,
+                 array_candidates: np.array,
+                 or_opt: bool = True) -> Tuple[float, list]:
+    """
+    Improve path using 2-opt and Or-opt moves until no improving move is found (local optimum).
+    For each city only moves connecting it with its nearest neighbours are checked and don't-look bits
+    skip cities whose surroundings did not change since their last check.
+
+    :param path: path to improve (with or without return to the starting city)
+    :param distance_matrix: precomputed distances between cities
+    :param array_candidates: 2D numpy array with nearest neighbours of each city sorted from the nearest one
+    :param or_opt: if False only 2-opt moves are used
+    :return: score and improved path (with return to the starting city)
+    """
+    path = [int(city) for city in path]
+    if len(path) > 1 and path[0] == path[-1]:
+        path = path[:-1]
+    num_of_cities = len(path)
+    if num_of_cities < 5:
+        path.append(path[0])
+        return tour_length(path, distance_matrix), path
+
+    # compiled kernel needs distances in the array (not in the distance provider)
+    if USE_NUMBA and isinstance(distance_matrix, np.ndarray) and distance_matrix.dtype == np.float64:
+        array_path = np.array(path, dtype=np.int64)
+        local_search_kernel(array_path, distance_matrix, np.asarray(array_candidates, dtype=np.int64), or_opt)
+        path = array_path.tolist()
+        path.append(path[0])
+        return tour_length(path, distance_matrix), path
+
+    list_position = [0] * num_of_cities
+    for idx, city in enumerate(path):
+        list_position[city] = idx
+    # neighbours are read as python lists, which is much faster than indexing numpy array one by one
+    list_candidates = array_candidates.tolist()
+
+    # cities with cleared don't-look bit waiting for the check
+    queue_cities = deque(path)
+    list_in_queue = [True] * num_of_cities
+    while queue_cities:
+        city = queue_cities.popleft()
+        list_in_queue[city] = False
+        list_changed = improve_two_opt(path, list_position, distance_matrix, list_candidates[city], city)
+        if list_changed is None and or_opt:
+            list_changed = improve_or_opt(path, list_position, distance_matrix, list_candidates[city], city)
+        if list_changed is None:
+            continue
+        # clear don't-look bits of the cities at the ends of changed arcs
+        for changed_city in list_changed:
+            if not list_in_queue[changed_city]:
+                list_in_queue[changed_city] = True
+                queue_cities.append(changed_city)
+
+    path.append(path[0])
+    return tour_length(path, distance_matrix), path
+
+
+def improve_two_opt(path: list, list_position: list, distance_matrix: np.array, list_neighbours: list, city: int):
+    num_of_cities = len(path)
+    idx = list_position[city]
+    for direction in (1, -1):
+        # arc (city, next_city) is replaced by (city, neighbour) and (next_city, neighbour_next)
+        next_city = path[(idx + direction) % num_of_cities]
+        dist_removed = distance_matrix[city, next_city]
+        for neighbour in list_neighbours:
+            dist_added = distance_matrix[city, neighbour]
+            # neighbours are sorted, so further ones can not give improvement
+            if dist_added >= dist_removed:
+                break
+            neighbour_next = path[(list_position[neighbour] + direction) % num_of_cities]
+            if neighbour_next == city or neighbour == next_city:
+                continue
+            delta = dist_added + distance_matrix[next_city, neighbour_next] - dist_removed - \
+                distance_matrix[neighbour, neighbour_next]
+            if delta < -EPSILON:
+                if direction == 1:
+                    reverse_segment(path, list_position, list_position[next_city], list_position[neighbour])
+                else:
+                    reverse_segment(path, list_position, list_position[neighbour], list_position[next_city])
+                return [city, next_city, neighbour, neighbour_next]
+    return None
+
+
+def improve_or_opt(path: list, list_position: list, distance_matrix: np.array, list_neighbours: list, city: int):
+    num_of_cities = len(path)
+    idx = list_position[city]
+    for segment_len in (1, 2, 3):
+        # segment starts with the city, it is cut out and inserted (maybe reversed) next to the neighbour
+        segment_first = city
+        segment_last = path[(idx + segment_len - 1) % num_of_cities]
+        prev_city = path[(idx - 1) % num_of_cities]
+        next_city = path[(idx + segment_len) % num_of_cities]
+        if next_city == prev_city:
+            break
+        gain_removal = distance_matrix[prev_city, segment_first] + distance_matrix[segment_last, next_city] - \
+            distance_matrix[prev_city, next_city]
+        if gain_removal <= EPSILON:
+            continue
+        set_segment = {path[(idx + i) % num_of_cities] for i in range(segment_len)}
+        for neighbour in list_neighbours:
+            if distance_matrix[segment_first, neighbour] >= gain_removal:
+                break
+            if neighbour in set_segment:
+                continue
+            neighbour_idx = list_position[neighbour]
+            # segment is inserted into arc (before_city, after_city) containing the neighbour
+            for before_city, after_city in ((neighbour, path[(neighbour_idx + 1) % num_of_cities]),
+                                            (path[(neighbour_idx - 1) % num_of_cities], neighbour)):
+                if before_city in set_segment or after_city in set_segment:
+                    continue
+                dist_arc = distance_matrix[before_city, after_city]
+                cost_keep = distance_matrix[before_city, segment_first] + \
+                    distance_matrix[segment_last, after_city] - dist_arc
+                cost_reverse = distance_matrix[before_city, segment_last] + \
+                    distance_matrix[segment_first, after_city] - dist_arc
+                if min(cost_keep, cost_reverse) - gain_removal < -EPSILON:
+                    move_segment(path, list_position, idx, segment_len, before_city, cost_reverse < cost_keep)
+                    return [prev_city, next_city, before_city, after_city, segment_first, segment_last]
+    return None
+
+
+def reverse_segment(path: list, list_position: list, start: int, end: int) -> None:
+    # reverse cities from start to end position going forward (segment can go through the end of the list),
+    # reversing the rest of the path gives the same tour, so the shorter part is reversed
+    num_of_cities = len(path)
+    segment_len = (end - start) % num_of_cities + 1
+    if 2 * segment_len > num_of_cities:
+        start, end = (end + 1) % num_of_cities, (start - 1) % num_of_cities
+        segment_len = num_of_cities - segment_len
+    for i in range(segment_len // 2):
+        idx_1 = (start + i) % num_of_cities
+        idx_2 = (end - i) % num_of_cities
+        city_1, city_2 = path[idx_1], path[idx_2]
+        path[idx_1], path[idx_2] = city_2, city_1
+        list_position[city_2], list_position[city_1] = idx_1, idx_2
+
+
+def move_segment(path: list, list_position: list, start: int, segment_len: int, before_city: int,
+                 reverse: bool) -> None:
+    # rotate path, so the segment is at the beginning, then insert it after before_city
+    rotated = path[start:] + path[:start]
+    segment = rotated[:segment_len]
+    if reverse:
+        segment.reverse()
+    rest = rotated[segment_len:]
+    insert_idx = rest.index(before_city) + 1
+    path[:] = rest[:insert_idx] + segment + rest[insert_idx:]
+    for idx, city in enumerate(path):
+        list_position[city] = idx
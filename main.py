@@ -1,15 +1,90 @@
 import numpy as np
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from ant_system import ant_system
 from genetic_algorithm import genetic_algorithm
 from simulated_annealing import simulated_annealing
-from matplotlib import pyplot as plt
-from matplotlib.ticker import MultipleLocator
+from instances import load_instance
+from shared_arrays import share_or_map, attach_array, release_shared
+from seeding import spawn_seeds, seed_generators
+from plot_results import plot_runs
+from typing import Tuple
 
 
-def main():
-    # reading data
-    cities_file = np.loadtxt(r'Data\cities_4.txt').T
+DICT_ALGORITHMS = {'Ant system': ant_system,
+                   'Genetic algorithm': genetic_algorithm,
+                   'Simulated annealing': simulated_annealing}
+
+# cities and distances attached to shared memory by each worker process
+dict_worker_data = {}
+
+
+def init_worker(cities_description: tuple, distance_matrix_description: tuple) -> None:
+    # shared memory blocks are kept to hold the arrays alive as long as the worker works
+    shm_cities, cities = attach_array(cities_description)
+    shm_distance_matrix, distance_matrix = attach_array(distance_matrix_description)
+    dict_worker_data.update({'cities': cities, 'distance_matrix': distance_matrix,
+                             'shm': [shm_cities, shm_distance_matrix]})
+
+
+def run_algorithm(algorithm_name: str, parameters: tuple, seed: int) -> Tuple[float, float]:
+    # each run has its own random numbers stream, so results do not depend on the worker running it
+    seed_generators(seed)
+    start = time.perf_counter()
+    best_score, best_path = DICT_ALGORITHMS[algorithm_name](dict_worker_data['cities'], *parameters,
+                                                            distance_matrix=dict_worker_data['distance_matrix'])
+    end = time.perf_counter()
+    return best_score, end - start
+
+
+def run_parallel(cities: np.array,
+                 distance_matrix: np.array,
+                 dict_parameters: dict,
+                 algorithms_runs: int,
+                 num_of_workers: int = None,
+                 base_seed: int = 0) -> dict:
+    """
+    Run each algorithm many times using pool of processes
+
+    :param cities: 2D numpy array of cities
+    :param distance_matrix: precomputed distances between cities
+    :param dict_parameters: algorithm name (key of DICT_ALGORITHMS) and tuple of its parameters (without cities
+    and distance matrix)
+    :param algorithms_runs: number of runs of each algorithm
+    :param num_of_workers: number of processes (number of processors if not given)
+    :param base_seed: seed from which independent seed of each run is derived
+    :return: algorithm name and 2D numpy array with best score and time of each run
+    """
+    list_tasks = [(algorithm_name, parameters)
+                  for algorithm_name, parameters in dict_parameters.items()
+                  for _ in range(algorithms_runs)]
+    list_seeds = spawn_seeds(base_seed, len(list_tasks))
+
+    # data is copied to shared memory (or opened from cached files) once instead of pickling it for each task
+    shm_cities, cities_description = share_or_map(cities)
+    shm_distance_matrix, distance_matrix_description = share_or_map(distance_matrix)
+    try:
+        with ProcessPoolExecutor(max_workers=num_of_workers, initializer=init_worker,
+                                 initargs=(cities_description, distance_matrix_description)) as executor:
+            list_futures = [executor.submit(run_algorithm, algorithm_name, parameters, seed)
+                            for (algorithm_name, parameters), seed in zip(list_tasks, list_seeds)]
+            list_results = [future.result() for future in list_futures]
+    finally:
+        release_shared([shm_cities, shm_distance_matrix])
+
+    dict_results = {}
+    for idx, algorithm_name in enumerate(dict_parameters):
+        dict_results[algorithm_name] = np.array(list_results[idx * algorithms_runs:(idx + 1) * algorithms_runs])
+    return dict_results
+
+
+def main(num_of_workers: int = None,
+         base_seed: int = 0,
+         instance_path: str = os.path.join('Data', 'cities_4.txt')):
+    # reading data, parsed cities and distances are cached, so they are calculated once and shared by all
+    # algorithms, runs and next executions
+    cities_file, distance_matrix = load_instance(instance_path, cache_dir=os.path.join('Data', 'cache'))
 
     # Parameters for Ant system
     # num of: ants/ cities
@@ -21,8 +96,7 @@ def main():
     p = 0.5
     # number of iterations
     num_of_iter = 250
-    tuple_parameters_as = tuple((cities_file,
-                                 k,
+    tuple_parameters_as = tuple((k,
                                  num_of_iter,
                                  alpha,
                                  beta,
@@ -39,8 +113,7 @@ def main():
     num_of_iter = 1000
     # algorithm used to select parents from population
     selection = 'roulette_wheel'
-    tuple_parameters_ga = tuple((cities_file,
-                                 population_size,
+    tuple_parameters_ga = tuple((population_size,
                                  num_of_iter,
                                  n,
                                  mutation_probability,
@@ -55,56 +128,23 @@ def main():
     alpha = 0.998
     # scheduling type
     scheduling = 'inverse'  # 'exponential'
-    tuple_parameters_sa = tuple((cities_file,
-                                 initial_temperature,
+    tuple_parameters_sa = tuple((initial_temperature,
                                  minimum_temperature,
                                  alpha,
                                  scheduling))
 
     algorithms_runs = 30
-    list_results_as = np.zeros((algorithms_runs, 2))
-    list_results_ga = np.zeros((algorithms_runs, 2))
-    list_results_sa = np.zeros((algorithms_runs, 2))
-    for iteration in range(algorithms_runs):
-        start_as = time.time()
-        best_score_as, best_path_as = ant_system(*tuple_parameters_as)
-        end_as = time.time()
-        list_results_as[iteration] = [best_score_as, end_as - start_as]
-
-        start_ga = time.time()
-        best_score_ga, best_path_ga = genetic_algorithm(*tuple_parameters_ga)
-        end_ga = time.time()
-        list_results_ga[iteration] = [best_score_ga, end_ga - start_ga]
-
-        start_sa = time.time()
-        best_score_sa, best_path_sa = simulated_annealing(*tuple_parameters_sa)
-        end_sa = time.time()
-        list_results_sa[iteration] = [best_score_sa, end_sa - start_sa]
-
-    list_iter_numbers = [i for i in range(1, algorithms_runs + 1)]
-
-    fig, ax = plt.subplots(2, 1, figsize=(12, 6))
-    fig.tight_layout(pad=2.0)
-    ax[0].set_title('Best scores of each algorithm')
-    ax[0].plot(list_iter_numbers, list_results_as[:, 0], label='Ant system')
-    ax[0].plot(list_iter_numbers, list_results_ga[:, 0], label='Genetic algorithm')
-    ax[0].plot(list_iter_numbers, list_results_sa[:, 0], label='Simulated annealing')
-    ax[0].xaxis.set_major_locator(MultipleLocator(1))
-    ax[0].legend(loc='upper right')
-    ax[0].set_xlabel('Iteration number')
-    ax[0].set_ylabel('Best score')
-
-    ax[1].set_title('Times of execution of each algorithm')
-    ax[1].plot(list_iter_numbers, list_results_as[:, 1], label='Ant system')
-    ax[1].plot(list_iter_numbers, list_results_ga[:, 1], label='Genetic algorithm')
-    ax[1].plot(list_iter_numbers, list_results_sa[:, 1], label='Simulated annealing')
-    ax[1].xaxis.set_major_locator(MultipleLocator(1))
-    ax[1].legend(loc='upper right')
-    ax[1].set_xlabel('Iteration number')
-    ax[1].set_ylabel('Best score')
-    plt.show()
-
-    fig.savefig('results.png')
+    dict_results = run_parallel(cities_file, distance_matrix,
+                                {'Ant system': tuple_parameters_as,
+                                 'Genetic algorithm': tuple_parameters_ga,
+                                 'Simulated annealing': tuple_parameters_sa},
+                                algorithms_runs, num_of_workers, base_seed)
+    list_results_as = dict_results['Ant system']
+    list_results_ga = dict_results['Genetic algorithm']
+    list_results_sa = dict_results['Simulated annealing']
+
+    # plot is saved without opening a window, so the script can run without display
+    plot_runs(dict_results, 'results.png')
 
     with open('results.txt', 'w') as f:
         f.writelines(['Mean best distances:\n',
@@ -0,0 +1,89 @@
+import argparse
+import os
+import matplotlib
+import numpy as np
+from typing import List
+from benchmark import load_results
+
+# plots are only saved to files, so non-interactive backend is used and no window is opened
+matplotlib.use('Agg')
+from matplotlib import pyplot as plt  # noqa: E402
+from matplotlib.ticker import MultipleLocator  # noqa: E402
+
+
+def plot_benchmark(list_records: List[dict], output_path: str) -> None:
+    """
+    Plot mean score (with standard deviation), mean time and evaluations per second of each configuration
+    on each instance
+
+    :param list_records: records returned by benchmark.run_benchmark (or read by benchmark.load_results)
+    :param output_path: path of the image file
+    """
+    list_instances = list(dict.fromkeys(record['instance'] for record in list_records))
+    list_configurations = list(dict.fromkeys(record['configuration'] for record in list_records))
+    dict_records = {(record['instance'], record['configuration']): record for record in list_records}
+
+    fig, ax = plt.subplots(3, 1, figsize=(12, 12))
+    array_x = np.arange(len(list_instances))
+    width = 0.8 / len(list_configurations)
+    for idx, configuration in enumerate(list_configurations):
+        list_used = [dict_records.get((instance, configuration)) for instance in list_instances]
+        array_positions = array_x + (idx - (len(list_configurations) - 1) / 2) * width
+        array_mean_score = np.array([np.nan if record is None else record['mean_score'] for record in list_used])
+        array_std_score = np.array([np.nan if record is None else record['std_score'] for record in list_used])
+        array_time = np.array([np.nan if record is None else record['mean_time'] for record in list_used])
+        array_speed = np.array([np.nan if record is None else record['evaluations_per_second']
+                                for record in list_used])
+        ax[0].bar(array_positions, array_mean_score, width, yerr=array_std_score, label=configuration)
+        ax[1].bar(array_positions, array_time, width, label=configuration)
+        ax[2].bar(array_positions, array_speed, width, label=configuration)
+
+    for axis, title in zip(ax, ('Mean best scores', 'Mean times of execution [s]', 'Evaluations per second')):
+        axis.set_title(title)
+        axis.set_xticks(array_x)
+        axis.set_xticklabels(list_instances)
+    ax[2].set_yscale('log')
+    ax[0].legend(loc='upper left', fontsize='small')
+    fig.tight_layout(pad=2.0)
+    fig.savefig(output_path)
+    plt.close(fig)
+
+
+def plot_runs(dict_results: dict, output_path: str) -> None:
+    """
+    Plot best score and time of each run of each algorithm
+
+    :param dict_results: algorithm name and 2D numpy array with best score and time of each run
+    (as returned by main.run_parallel)
+    :param output_path: path of the image file
+    """
+    fig, ax = plt.subplots(2, 1, figsize=(12, 6))
+    fig.tight_layout(pad=2.0)
+    for algorithm_name, array_results in dict_results.items():
+        list_iter_numbers = [i for i in range(1, array_results.shape[0] + 1)]
+        ax[0].plot(list_iter_numbers, array_results[:, 0], label=algorithm_name)
+        ax[1].plot(list_iter_numbers, array_results[:, 1], label=algorithm_name)
+
+    ax[0].set_title('Best scores of each algorithm')
+    ax[0].set_ylabel('Best score')
+    ax[1].set_title('Times of execution of each algorithm')
+    ax[1].set_ylabel('Time [s]')
+    for axis in ax:
+        axis.xaxis.set_major_locator(MultipleLocator(1))
+        axis.legend(loc='upper right')
+        axis.set_xlabel('Iteration number')
+    fig.savefig(output_path)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plot results saved by benchmark.py')
+    parser.add_argument('results_dir', nargs='?', default='benchmark_results', help='directory with results.json')
+    parser.add_argument('--output', default=None, help='path of the image (results_dir/results.png if not given)')
+    args = parser.parse_args()
+    output_path = args.output if args.output is not None else os.path.join(args.results_dir, 'results.png')
+    plot_benchmark(load_results(args.results_dir), output_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+import time
+from typing import Callable, Iterator
+from instrumentation import Instrumentation
+
+
+def make_progress(best_score: float, best_path: list, iteration: int, evaluations: int, start_time: float) -> dict:
+    """
+    Describe state of the algorithm after finding new best path
+
+    :param best_score: length of the best path found so far
+    :param best_path: best path found so far (with return to the starting city)
+    :param iteration: number of finished iterations (tours, generations or moves)
+    :param evaluations: number of evaluated paths (or moves)
+    :param start_time: value of time.perf_counter() when the algorithm started
+    :return: dictionary with the given values and time elapsed from the start
+    """
+    return {'best_score': float(best_score), 'best_path': best_path, 'iteration': iteration,
+            'evaluations': evaluations, 'elapsed': time.perf_counter() - start_time}
+
+
+def run_to_end(progress_iterator: Iterator[dict],
+               callback: Callable[[dict], bool] = None,
+               instrumentation: Instrumentation = None) -> tuple:
+    # consume progress of the algorithm, callback returning True cancels the search,
+    # summary of the given instrumentation is returned together with the result
+    progress = None
+    for progress in progress_iterator:
+        if callback is not None and callback(progress):
+            progress_iterator.close()
+            break
+    if instrumentation is not None:
+        return progress['best_score'], progress['best_path'], instrumentation.summary()
+    return progress['best_score'], progress['best_path']
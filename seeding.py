@@ -0,0 +1,22 @@
+import random
+import numpy as np
+from typing import List
+
+
+def spawn_seeds(base_seed: int, num_of_seeds: int) -> List[int]:
+    """
+    Derive independent seeds of many runs (or workers) from one seed, results are reproducible and do not
+    depend on the order in which the runs are made
+
+    :param base_seed: seed from which the other seeds are derived
+    :param num_of_seeds: number of seeds
+    :return: list of integer seeds
+    """
+    return [int(seed_sequence.generate_state(1)[0])
+            for seed_sequence in np.random.SeedSequence(base_seed).spawn(num_of_seeds)]
+
+
+def seed_generators(seed: int) -> None:
+    # algorithms draw from both python and numpy global generators
+    random.seed(seed)
+    np.random.seed(seed)
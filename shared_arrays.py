@@ -0,0 +1,73 @@
+import os
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Tuple
+
+
+def share_array(array: np.array) -> Tuple[shared_memory.SharedMemory, tuple]:
+    """
+    Copy numpy array into shared memory block, which can be attached by other processes without pickling data
+
+    :param array: numpy array to share
+    :return: shared memory block (has to be closed and unlinked by the owner) and description of the array
+    used by attach_array
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    array_shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    array_shared[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def share_or_map(array: np.array) -> Tuple[shared_memory.SharedMemory, tuple]:
+    """
+    Share array with other processes. Array memory mapped from whole .npy file (like cached instances) is
+    opened by other processes from the same file, other arrays are copied into shared memory.
+
+    :param array: numpy array (or distance provider) to share
+    :return: shared memory block (None for memory mapped file and provider) and description of the array
+    used by attach_array
+    """
+    if not isinstance(array, np.ndarray):
+        # distance providers computing distances from coordinates are small, so they are pickled
+        return None, (array,)
+    filename = getattr(array, 'filename', None)
+    if filename is not None and filename.endswith('.npy') and os.path.exists(filename):
+        array_file = np.load(filename, mmap_mode='r')
+        # views of the part of the file can not be opened by other processes
+        if (array_file.shape, array_file.dtype, array_file.strides) == (array.shape, array.dtype, array.strides):
+            return None, (filename, array.shape, array.dtype.str, 'file')
+    return share_array(array)
+
+
+def attach_array(description: tuple) -> Tuple[shared_memory.SharedMemory, np.array]:
+    """
+    Attach to array shared by share_array (or share_or_map)
+
+    :param description: description of the array returned by share_array
+    :return: shared memory block (has to be kept as long as array is used, None for memory mapped file)
+    and read only array using it
+    """
+    if len(description) == 1:
+        return None, description[0]
+    if len(description) == 4:
+        # memory mapped file is shared by the operating system page cache
+        return None, np.load(description[0], mmap_mode='r')
+    name, shape, dtype = description
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before Python 3.13 attached block is registered again in resource tracker shared with the owner,
+        # which is harmless because the owner unregisters it when unlinking
+        shm = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    array.flags.writeable = False
+    return shm, array
+
+
+def release_shared(list_shm: list) -> None:
+    # owner closes and removes shared memory blocks
+    for shm in list_shm:
+        if shm is None:
+            continue
+        shm.close()
+        shm.unlink()
@@ -1,14 +1,38 @@
 import numpy as np
 import random
-from scipy.spatial import distance
-from typing import Tuple
+import time
+from typing import Callable, Iterator, Tuple
+from distances import calc_distance_matrix, tour_length
+from candidates import candidate_lists
+from termination import Termination, iteration_range
+from progress import make_progress, run_to_end
+from instrumentation import Instrumentation
+from initialization import open_path, initial_path_for
+from local_search import local_search, NUM_OF_CANDIDATES
+
+# minimum time in seconds between progress reports of annealing with delta evaluation (when termination
+# is given its min_check_interval is used)
+PROGRESS_INTERVAL = 0.01
+# number of moves between checks whether improvement waiting for the progress report can be reported
+PROGRESS_CHECK_MOVES = 1024
 
 
 def simulated_annealing(cities: np.array,
                         initial_temperature: float,
                         minimum_temperature: float,
                         alpha: float,
-                        scheduling: str) -> Tuple[float, list]:
+                        scheduling: str,
+                        distance_matrix: np.array = None,
+                        move: str = 'swap',
+                        delta_evaluation: bool = False,
+                        num_of_candidates: int = None,
+                        termination: Termination = None,
+                        callback: Callable[[dict], bool] = None,
+                        use_local_search: bool = False,
+                        instrumentation: Instrumentation = None,
+                        initial_path: list = None,
+                        initialization: str = 'random',
+                        return_statistics: bool = False) -> tuple:
     """
     Solving Traveling Salesman Problem using Genetic Algorithm
 
@@ -17,40 +41,434 @@ def simulated_annealing(cities: np.array,
     :param minimum_temperature: when our temperature reached that level algorithm working ends
     :param alpha: parameter used to scheduling calculation
     :param scheduling: define how temperature is decreasing. Can obtain two values: "exponential" or "inverse"
+    :param distance_matrix: precomputed distances between cities (calculated from cities if not given)
+    :param move: type of the move used to create new path. Can obtain three values: "swap", "2-opt" or "or-opt"
+    (the last two only with delta evaluation)
+    :param delta_evaluation: if True cost of each move is calculated only from changed edges and the path
+    is changed in place when the move is accepted, else whole path is copied and evaluated
+    :param num_of_candidates: if given (only with delta evaluation), moves mostly connect city with one of
+    that number of its nearest neighbours instead of choosing positions uniformly
+    :param termination: additional stopping criteria checked after each move (with minimum_temperature
+    equal to 0 only they stop the algorithm)
+    :param callback: function called with progress (see simulated_annealing_iter) after finding new best path,
+    returning True stops the algorithm
+    :param use_local_search: if True the final path is improved with 2-opt and Or-opt local search
+    :param instrumentation: if given, time of each phase (annealing, local_search), counters of accepted,
+    rejected and improving moves and trace of the temperature, current and best cost and acceptance rate
+    are collected in it
+    :param initial_path: path (for example found earlier for similar instance) used as the starting solution
+    instead of random one
+    :param initialization: way of creating the first path when initial_path is not given. Can obtain values:
+    "random", "nearest_neighbour", "greedy", "space_filling_curve" or "christofides" (see initialization.py)
+    :param return_statistics: if True summary of instrumentation (created if not given) is returned
+    together with the result
     :return: best score (as an float) and best route (indexes of the cities) found
+    (and summary of instrumentation if return_statistics is True)
+    """
+    if return_statistics and instrumentation is None:
+        instrumentation = Instrumentation()
+    return run_to_end(simulated_annealing_iter(cities, initial_temperature, minimum_temperature, alpha, scheduling,
+                                               distance_matrix, move, delta_evaluation, num_of_candidates,
+                                               termination, use_local_search, instrumentation, initial_path,
+                                               initialization),
+                      callback, instrumentation if return_statistics else None)
+
+
+def simulated_annealing_iter(cities: np.array,
+                             initial_temperature: float,
+                             minimum_temperature: float,
+                             alpha: float,
+                             scheduling: str,
+                             distance_matrix: np.array = None,
+                             move: str = 'swap',
+                             delta_evaluation: bool = False,
+                             num_of_candidates: int = None,
+                             termination: Termination = None,
+                             use_local_search: bool = False,
+                             instrumentation: Instrumentation = None,
+                             initial_path: list = None,
+                             initialization: str = 'random') -> Iterator[dict]:
     """
+    Simulated Annealing yielding progress each time new best path is found, parameters are the same as in
+    simulated_annealing. Search can be cancelled at any moment by closing the generator. With delta evaluation
+    progress is yielded at most every PROGRESS_INTERVAL seconds with the score accumulated from deltas,
+    exact score of the best path is yielded at the end.
 
+    :return: generator of dictionaries with best_score, best_path, iteration (number of moves),
+    evaluations (number of evaluated moves) and elapsed (seconds from the start)
+    """
+    start_time = time.perf_counter()
+    # time limit counts also preparation (distances, candidate lists, initial paths)
+    if termination is not None:
+        termination.start()
     num_of_cities = cities.shape[0]
+    if distance_matrix is None:
+        distance_matrix = calc_distance_matrix(cities)
+    if instrumentation is not None:
+        instrumentation.watch_cache('distance_cache', distance_matrix)
+    array_candidates = None
+    if num_of_candidates is not None:
+        array_candidates = candidate_lists(cities, num_of_candidates)
+    # path built by construction heuristic is used as the starting solution
+    initial_path = initial_path_for(cities, initialization, initial_path)
+    if initial_path is not None:
+        initial_path = open_path(initial_path, num_of_cities)
+    if delta_evaluation:
+        annealing = annealing_with_delta_evaluation(num_of_cities, distance_matrix, initial_temperature,
+                                                    minimum_temperature, alpha, scheduling, move, array_candidates,
+                                                    termination, start_time, instrumentation, initial_path)
+    elif move != 'swap' or num_of_candidates is not None:
+        raise ValueError(f"Move '{move}' and candidate lists are available only with delta evaluation")
+    else:
+        annealing = annealing_with_full_evaluation(num_of_cities, distance_matrix, initial_temperature,
+                                                   minimum_temperature, alpha, scheduling, termination, start_time,
+                                                   instrumentation, initial_path)
+
+    progress = None
+    if instrumentation is not None:
+        instrumentation.start_laps()
+    for progress in annealing:
+        if instrumentation is not None:
+            instrumentation.lap('annealing')
+        yield progress
+        # time spent by the consumer of the progress is not measured
+        if instrumentation is not None:
+            instrumentation.start_laps()
+    if instrumentation is not None:
+        instrumentation.lap('annealing')
+
+    # final path is improved by local search (unless time limit was already used up)
+    if use_local_search and (termination is None or not termination.out_of_time()):
+        if array_candidates is None:
+            array_candidates = candidate_lists(cities, NUM_OF_CANDIDATES)
+        best_score, best_path = local_search(progress['best_path'], distance_matrix, array_candidates)
+        if instrumentation is not None:
+            instrumentation.lap('local_search')
+        if best_score < progress['best_score']:
+            yield make_progress(best_score, best_path, progress['iteration'], progress['evaluations'], start_time)
+
+
+def annealing_with_full_evaluation(num_of_cities: int,
+                                   distance_matrix: np.array,
+                                   initial_temperature: float,
+                                   minimum_temperature: float,
+                                   alpha: float,
+                                   scheduling: str,
+                                   termination: Termination = None,
+                                   start_time: float = None,
+                                   instrumentation: Instrumentation = None,
+                                   initial_path: list = None) -> Iterator[dict]:
     temperature = initial_temperature
-    # generate random solution and set it as the best, calculate distance between cities
-    best_element = generate_one_path(num_of_cities)
-    best_element = evaluate_cost(best_element, cities)
+    # generate random solution (if initial path was not given) and set it as the best, calculate distance
+    # between cities
+    if initial_path is None:
+        best_element = generate_one_path(num_of_cities)
+    else:
+        best_element = {'path': initial_path + initial_path[:1], 'dist_traveled': 0}
+    best_element = evaluate_cost(best_element, distance_matrix)
+    # best element is the actual solution, so the best one found is remembered separately
+    best_score = best_element['dist_traveled']
+    yield make_progress(best_score, best_element['path'], 0, 1, start_time)
 
-    element = {}
+    num_of_moves = 0
     while temperature > minimum_temperature:
         # mutation of the best solution, calculate distance between cities
         element = swap_mutation(best_element)
-        element = evaluate_cost(element, cities)
+        element = evaluate_cost(element, distance_matrix)
         # if new solution is better than actual best change elements, else check probability
         # of accepting worst solution with random number
-        if element['dist_traveled'] < best_element['dist_traveled']:
+        accepted = True
+        improving = element['dist_traveled'] < best_element['dist_traveled']
+        if improving:
             best_element = element
         else:
             rand = random.uniform(0, 1)
             p = np.exp((best_element['dist_traveled'] - element['dist_traveled'])/temperature)
             if rand < p:
                 best_element = element
+            else:
+                accepted = False
+
+        num_of_moves += 1
+        if instrumentation is not None:
+            record_move(instrumentation, num_of_moves, accepted, improving, temperature,
+                        best_element['dist_traveled'], min(best_score, best_element['dist_traveled']))
+        if best_element['dist_traveled'] < best_score:
+            best_score = best_element['dist_traveled']
+            yield make_progress(best_score, best_element['path'], num_of_moves, num_of_moves + 1, start_time)
 
         # temperature scheduling
-        if scheduling == 'exponential':
-            temperature = alpha*temperature
-        elif scheduling == 'inverse':
-            beta = 1 - alpha
-            temperature = temperature/(1+beta*temperature)
+        temperature = next_temperature(temperature, alpha, scheduling)
+
+        if termination is not None and termination.update(best_element['dist_traveled']):
+            break
+
+
+def annealing_with_delta_evaluation(num_of_cities: int,
+                                    distance_matrix: np.array,
+                                    initial_temperature: float,
+                                    minimum_temperature: float,
+                                    alpha: float,
+                                    scheduling: str,
+                                    move: str,
+                                    array_candidates: np.array = None,
+                                    termination: Termination = None,
+                                    start_time: float = None,
+                                    instrumentation: Instrumentation = None,
+                                    initial_path: list = None) -> Iterator[dict]:
+    if move not in DICT_MOVES:
+        raise ValueError(f"Unknown move '{move}', use one of: {', '.join(DICT_MOVES)}")
+    propose_move, move_delta, apply_move = DICT_MOVES[move]
+    propose_candidate_move, changed_positions = DICT_CANDIDATE_MOVES[move]
+
+    temperature = initial_temperature
+    # current path is kept without return to the starting city and changed only in place
+    path = generate_one_path(num_of_cities)['path'][:-1] if initial_path is None else list(initial_path)
+    current_cost = tour_length(path + path[:1], distance_matrix)
+    best_cost = current_cost
+    yield make_progress(best_cost, path + path[:1], 0, 1, start_time)
+    # position of each city in the path is needed to find neighbours of the city in the path
+    list_position = []
+    if array_candidates is not None:
+        list_position = [0] * num_of_cities
+        for idx, city in enumerate(path):
+            list_position[city] = idx
+
+    # best path is copied only when the current path leaves it (at_best is False then), score of the best path
+    # is the accumulated cost, which is recalculated only at the end
+    at_best = True
+    best_path = None
+    best_moves = 0
+    # progress is yielded not more often than every progress_interval seconds, improvement waiting for it
+    # is pending
+    progress_interval = termination.min_check_interval if termination is not None else PROGRESS_INTERVAL
+    last_progress_time = time.perf_counter()
+    pending = False
+    num_of_moves = 0
+    while temperature > minimum_temperature:
+        # cost change is calculated only from the edges touched by the move
+        move_args = None
+        if array_candidates is not None:
+            move_args = propose_candidate_move(path, list_position, array_candidates)
+        if move_args is None:
+            move_args = propose_move(num_of_cities)
+        delta = move_delta(path, distance_matrix, *move_args)
+        accepted = delta < 0 or random.uniform(0, 1) < np.exp(-delta/temperature)
+        if accepted:
+            if at_best and delta >= 0:
+                best_path = path + path[:1]
+                at_best = False
+            apply_move(path, *move_args)
+            if array_candidates is not None:
+                for idx in changed_positions(*move_args):
+                    list_position[path[idx]] = idx
+            current_cost += delta
+            if current_cost < best_cost:
+                best_cost = current_cost
+                best_moves = num_of_moves + 1
+                at_best = True
+                pending = True
+                now = time.perf_counter()
+                if now - last_progress_time >= progress_interval:
+                    last_progress_time = now
+                    pending = False
+                    yield make_progress(best_cost, path + path[:1], best_moves, best_moves + 1, start_time)
+        num_of_moves += 1
+        if instrumentation is not None:
+            record_move(instrumentation, num_of_moves, accepted, delta < 0, temperature, current_cost, best_cost)
+        # improvement found after the last progress is yielded when no other improvements come
+        if pending and num_of_moves % PROGRESS_CHECK_MOVES == 0:
+            now = time.perf_counter()
+            if now - last_progress_time >= progress_interval:
+                last_progress_time = now
+                pending = False
+                yield make_progress(best_cost, path + path[:1] if at_best else best_path, best_moves,
+                                    best_moves + 1, start_time)
+
+        # temperature scheduling
+        temperature = next_temperature(temperature, alpha, scheduling)
+
+        if termination is not None and termination.update(best_cost):
+            break
+
+    # exact cost of the best path drops rounding errors accumulated by deltas
+    if at_best:
+        best_path = path + path[:1]
+    exact_cost = tour_length(best_path, distance_matrix)
+    if pending or exact_cost != best_cost:
+        yield make_progress(exact_cost, best_path, best_moves, best_moves + 1, start_time)
+
+
+def parallel_tempering(cities: np.array,
+                       num_of_replicas: int,
+                       minimum_temperature: float,
+                       maximum_temperature: float,
+                       num_of_steps: int,
+                       swap_interval: int = 100,
+                       distance_matrix: np.array = None,
+                       termination: Termination = None,
+                       callback: Callable[[dict], bool] = None,
+                       instrumentation: Instrumentation = None,
+                       return_statistics: bool = False) -> tuple:
+    """
+    Solving Traveling Salesman Problem using parallel tempering (multi-chain Simulated Annealing).
+    Replicas work at constant temperatures spread geometrically between the minimum and maximum temperature,
+    in each step every replica proposes 2-opt move (evaluated for all replicas at once with NumPy) and every
+    swap_interval steps replicas at neighbouring temperatures try to exchange their paths.
+
+    :param cities: 2D numpy array of cities
+    :param num_of_replicas: number of Markov chains
+    :param minimum_temperature: temperature of the coldest replica
+    :param maximum_temperature: temperature of the hottest replica
+    :param num_of_steps: number of moves proposed by each replica (no limit if None, then termination
+    has to be given)
+    :param swap_interval: number of steps between exchanges of paths
+    :param distance_matrix: precomputed distances between cities (calculated from cities if not given)
+    :param termination: additional stopping criteria checked after each step
+    :param callback: function called with progress (see parallel_tempering_iter) after finding new best path,
+    returning True stops the algorithm
+    :param instrumentation: if given, time of each phase (moves, exchange), counters of accepted and rejected
+    moves and proposed and accepted exchanges and trace of the cost of each replica are collected in it
+    :param return_statistics: if True summary of instrumentation (created if not given) is returned
+    together with the result
+    :return: best score (as an float) and best route (indexes of the cities) found by all replicas
+    (and summary of instrumentation if return_statistics is True)
+    """
+    if return_statistics and instrumentation is None:
+        instrumentation = Instrumentation()
+    return run_to_end(parallel_tempering_iter(cities, num_of_replicas, minimum_temperature, maximum_temperature,
+                                              num_of_steps, swap_interval, distance_matrix, termination,
+                                              instrumentation),
+                      callback, instrumentation if return_statistics else None)
+
+
+def parallel_tempering_iter(cities: np.array,
+                            num_of_replicas: int,
+                            minimum_temperature: float,
+                            maximum_temperature: float,
+                            num_of_steps: int,
+                            swap_interval: int = 100,
+                            distance_matrix: np.array = None,
+                            termination: Termination = None,
+                            instrumentation: Instrumentation = None) -> Iterator[dict]:
+    """
+    Parallel tempering yielding progress each time new best path is found, parameters are the same as in
+    parallel_tempering. Search can be cancelled at any moment by closing the generator.
+
+    :return: generator of dictionaries with best_score, best_path, iteration (number of steps),
+    evaluations (number of evaluated moves) and elapsed (seconds from the start)
+    """
+    start_time = time.perf_counter()
+    # time limit counts also preparation (distances and initial paths)
+    if termination is not None:
+        termination.start()
+    num_of_cities = cities.shape[0]
+    if distance_matrix is None:
+        distance_matrix = calc_distance_matrix(cities)
+    if instrumentation is not None:
+        instrumentation.watch_cache('distance_cache', distance_matrix)
+    array_replicas_idx = np.arange(num_of_replicas)
+    array_temperatures = np.geomspace(minimum_temperature, maximum_temperature, num_of_replicas)
+
+    # each row is path of one replica (without return to the starting city)
+    array_paths = np.argsort(np.random.uniform(0, 1, size=(num_of_replicas, num_of_cities)), axis=1)
+    array_costs = replicas_costs(array_paths, distance_matrix)
+    best_idx = np.argmin(array_costs)
+    best_score = array_costs[best_idx]
+    best_path = array_paths[best_idx].tolist() + [int(array_paths[best_idx, 0])]
+    yield make_progress(best_score, best_path, 0, num_of_replicas, start_time)
+
+    for step in iteration_range(num_of_steps, termination):
+        if instrumentation is not None:
+            instrumentation.start_laps()
+        # 2-opt move of each replica reverses path[start:end+1]
+        array_ends = np.sort(np.random.randint(0, num_of_cities, size=(2, num_of_replicas)), axis=0)
+        array_start, array_end = array_ends
+        array_city_before = array_paths[array_replicas_idx, array_start - 1]
+        array_city_start = array_paths[array_replicas_idx, array_start]
+        array_city_end = array_paths[array_replicas_idx, array_end]
+        array_city_after = array_paths[array_replicas_idx, (array_end + 1) % num_of_cities]
+        array_delta = distance_matrix[array_city_before, array_city_end] + \
+            distance_matrix[array_city_start, array_city_after] - \
+            distance_matrix[array_city_before, array_city_start] - \
+            distance_matrix[array_city_end, array_city_after]
+        # reversing segment shorter than two cities or the whole path does not change its length
+        array_delta[(array_end - array_start < 1) | (array_end - array_start >= num_of_cities - 1)] = 0
+
+        # Metropolis criterion for all replicas at once
+        with np.errstate(over='ignore'):
+            array_accepted = (array_delta < 0) | \
+                (np.random.uniform(0, 1, size=num_of_replicas) < np.exp(-array_delta / array_temperatures))
+        for replica_idx in np.flatnonzero(array_accepted):
+            start, end = array_start[replica_idx], array_end[replica_idx]
+            array_paths[replica_idx, start:end + 1] = array_paths[replica_idx, start:end + 1][::-1].copy()
+        array_costs[array_accepted] += array_delta[array_accepted]
+        if instrumentation is not None:
+            instrumentation.lap('moves')
+            num_of_accepted = int(np.count_nonzero(array_accepted))
+            instrumentation.count('accepted', num_of_accepted)
+            instrumentation.count('rejected', num_of_replicas - num_of_accepted)
+            instrumentation.count('evaluations', num_of_replicas)
+
+        if (step + 1) % swap_interval == 0:
+            # costs are recalculated to drop accumulated rounding errors
+            array_costs = replicas_costs(array_paths, distance_matrix)
+            first_idx = step // swap_interval % 2
+            num_of_exchanges = exchange_replicas(array_paths, array_costs, array_temperatures, first_idx)
+            if instrumentation is not None:
+                instrumentation.lap('exchange')
+                instrumentation.count('exchanges_proposed', (num_of_replicas - first_idx) // 2)
+                instrumentation.count('exchanges_accepted', num_of_exchanges)
+        if instrumentation is not None:
+            instrumentation.trace(step + 1, best=float(min(best_score, array_costs.min())),
+                                  costs=array_costs.tolist())
+
+        if array_costs.min() < best_score - 1e-10:
+            best_idx = np.argmin(array_costs)
+            best_path = array_paths[best_idx].tolist() + [int(array_paths[best_idx, 0])]
+            best_score = tour_length(best_path, distance_matrix)
+            yield make_progress(best_score, best_path, step + 1, num_of_replicas * (step + 2), start_time)
+
+        if termination is not None and termination.update(best_score, num_of_replicas):
+            break
+
+
+def replicas_costs(array_paths: np.array, distance_matrix: np.array) -> np.array:
+    return distance_matrix[array_paths, np.roll(array_paths, -1, axis=1)].sum(axis=1, dtype=np.float64)
+
 
-    best_score = element['dist_traveled']
-    best_path = element['path']
-    return best_score, best_path
+def exchange_replicas(array_paths: np.array, array_costs: np.array, array_temperatures: np.array,
+                      first_idx: int) -> int:
+    # pairs of neighbouring temperatures (starting from the first or the second replica, alternately)
+    # exchange paths with probability min(1, exp((E_i - E_j) * (1/T_i - 1/T_j))), number of exchanges is returned
+    num_of_exchanges = 0
+    for replica_idx in range(first_idx, array_temperatures.shape[0] - 1, 2):
+        exponent = (array_costs[replica_idx] - array_costs[replica_idx + 1]) * \
+            (1 / array_temperatures[replica_idx] - 1 / array_temperatures[replica_idx + 1])
+        if exponent >= 0 or random.uniform(0, 1) < np.exp(exponent):
+            array_paths[[replica_idx, replica_idx + 1]] = array_paths[[replica_idx + 1, replica_idx]]
+            array_costs[[replica_idx, replica_idx + 1]] = array_costs[[replica_idx + 1, replica_idx]]
+            num_of_exchanges += 1
+    return num_of_exchanges
+
+
+def record_move(instrumentation: Instrumentation, num_of_moves: int, accepted: bool, improving: bool,
+                temperature: float, current_cost: float, best_cost: float) -> None:
+    # counters of moves and trace of the annealing
+    instrumentation.count('accepted' if accepted else 'rejected')
+    if improving:
+        instrumentation.count('improving')
+    instrumentation.trace(num_of_moves, temperature=temperature, current=float(current_cost), best=float(best_cost),
+                          acceptance_rate=instrumentation.dict_counters['accepted'] / num_of_moves)
+
+
+def next_temperature(temperature: float, alpha: float, scheduling: str) -> float:
+    if scheduling == 'exponential':
+        temperature = alpha*temperature
+    elif scheduling == 'inverse':
+        beta = 1 - alpha
+        temperature = temperature/(1+beta*temperature)
+    return temperature
 
 
 def generate_one_path(num_of_cities: int) -> dict:
@@ -63,12 +481,9 @@ def generate_one_path(num_of_cities: int) -> dict:
     return {'path': list_of_cities_idx, 'dist_traveled': 0}
 
 
-def evaluate_cost(element: dict, cities: np.array) -> dict:
-    # calculate euclidean dist between each cities and sum up them
-    for list_idx in range(1, len(element['path'])):
-        actual_city = cities[element['path'][list_idx]]
-        previous_city = cities[element['path'][list_idx - 1]]
-        element['dist_traveled'] += distance.euclidean(actual_city, previous_city)
+def evaluate_cost(element: dict, distance_matrix: np.array) -> dict:
+    # look up distances between each cities and sum up them
+    element['dist_traveled'] = tour_length(element['path'], distance_matrix)
     return element
 
 
@@ -89,3 +504,155 @@ def swap_mutation(best_element: dict) -> dict:
     # rewrite changed element
     element['path'] = path
     return element
+
+
+def propose_swap(num_of_cities: int) -> Tuple[int, int]:
+    # choose to different positions in the path
+    idx_1 = random.randint(0, num_of_cities - 1)
+    idx_2 = random.randint(0, num_of_cities - 1)
+    while idx_2 == idx_1:
+        idx_2 = random.randint(0, num_of_cities - 1)
+    return idx_1, idx_2
+
+
+def swap_delta(path: list, distance_matrix: np.array, idx_1: int, idx_2: int) -> float:
+    num_of_cities = len(path)
+    # edge at position i connects path[i] and path[i+1], swap changes at most four of them
+    edges = {(idx_1 - 1) % num_of_cities, idx_1, (idx_2 - 1) % num_of_cities, idx_2}
+
+    def city_after_swap(idx):
+        idx %= num_of_cities
+        if idx == idx_1:
+            return path[idx_2]
+        if idx == idx_2:
+            return path[idx_1]
+        return path[idx]
+
+    delta = 0.
+    for edge in edges:
+        delta += distance_matrix[city_after_swap(edge), city_after_swap(edge + 1)]
+        delta -= distance_matrix[path[edge], path[(edge + 1) % num_of_cities]]
+    return delta
+
+
+def apply_swap(path: list, idx_1: int, idx_2: int) -> None:
+    path[idx_1], path[idx_2] = path[idx_2], path[idx_1]
+
+
+def propose_two_opt(num_of_cities: int) -> Tuple[int, int]:
+    # choose segment path[start:end+1] which will be reversed
+    start, end = sorted(propose_swap(num_of_cities))
+    return start, end
+
+
+def two_opt_delta(path: list, distance_matrix: np.array, start: int, end: int) -> float:
+    num_of_cities = len(path)
+    # reversing the whole path does not change its length
+    if end - start >= num_of_cities - 1:
+        return 0.
+    city_before = path[start - 1]
+    city_after = path[(end + 1) % num_of_cities]
+    return (distance_matrix[city_before, path[end]] + distance_matrix[path[start], city_after] -
+            distance_matrix[city_before, path[start]] - distance_matrix[path[end], city_after])
+
+
+def apply_two_opt(path: list, start: int, end: int) -> None:
+    path[start:end + 1] = path[start:end + 1][::-1]
+
+
+def propose_or_opt(num_of_cities: int) -> Tuple[int, int, int]:
+    # choose segment of 1 to 3 cities and position (outside the segment) after which it will be inserted
+    segment_len = random.randint(1, min(3, num_of_cities - 3))
+    start = random.randint(0, num_of_cities - segment_len)
+    insert_after = random.randint(0, num_of_cities - segment_len - 2)
+    # skip positions of the segment and the city right before it
+    if insert_after >= (start - 1) % num_of_cities and start > 0:
+        insert_after += segment_len + 1
+    elif start == 0:
+        insert_after += segment_len
+    return start, segment_len, insert_after
+
+
+def or_opt_delta(path: list, distance_matrix: np.array, start: int, segment_len: int, insert_after: int) -> float:
+    num_of_cities = len(path)
+    first_city = path[start]
+    last_city = path[start + segment_len - 1]
+    city_before = path[start - 1]
+    city_after = path[(start + segment_len) % num_of_cities]
+    insert_city_1 = path[insert_after]
+    insert_city_2 = path[(insert_after + 1) % num_of_cities]
+    return (distance_matrix[city_before, city_after] - distance_matrix[city_before, first_city] -
+            distance_matrix[last_city, city_after] - distance_matrix[insert_city_1, insert_city_2] +
+            distance_matrix[insert_city_1, first_city] + distance_matrix[last_city, insert_city_2])
+
+
+def apply_or_opt(path: list, start: int, segment_len: int, insert_after: int) -> None:
+    segment = path[start:start + segment_len]
+    del path[start:start + segment_len]
+    # removing the segment shifts positions placed after it
+    if insert_after > start:
+        insert_after -= segment_len
+    path[insert_after + 1:insert_after + 1] = segment
+
+
+# functions generating, evaluating and applying each type of move
+DICT_MOVES = {'swap': (propose_swap, swap_delta, apply_swap),
+              '2-opt': (propose_two_opt, two_opt_delta, apply_two_opt),
+              'or-opt': (propose_or_opt, or_opt_delta, apply_or_opt)}
+
+
+def random_candidate_pair(array_candidates: np.array) -> Tuple[int, int]:
+    city = random.randint(0, array_candidates.shape[0] - 1)
+    neighbour = int(array_candidates[city, random.randint(0, array_candidates.shape[1] - 1)])
+    return city, neighbour
+
+
+def propose_candidate_swap(path: list, list_position: list, array_candidates: np.array):
+    # put neighbour of the city right after it
+    city, neighbour = random_candidate_pair(array_candidates)
+    idx_1 = (list_position[city] + 1) % len(path)
+    idx_2 = list_position[neighbour]
+    if idx_1 == idx_2:
+        return None
+    return idx_1, idx_2
+
+
+def propose_candidate_two_opt(path: list, list_position: list, array_candidates: np.array):
+    # reverse segment between the city and its neighbour, so they become connected
+    city, neighbour = random_candidate_pair(array_candidates)
+    idx_1, idx_2 = sorted((list_position[city], list_position[neighbour]))
+    if idx_2 - idx_1 < 2:
+        return None
+    return idx_1 + 1, idx_2
+
+
+def propose_candidate_or_opt(path: list, list_position: list, array_candidates: np.array):
+    # move segment starting with neighbour of the city right after the city
+    num_of_cities = len(path)
+    city, neighbour = random_candidate_pair(array_candidates)
+    segment_len = random.randint(1, min(3, num_of_cities - 3))
+    start = list_position[neighbour]
+    insert_after = list_position[city]
+    if start + segment_len > num_of_cities or \
+            start - 1 <= insert_after < start + segment_len or \
+            (start == 0 and insert_after == num_of_cities - 1):
+        return None
+    return start, segment_len, insert_after
+
+
+def swap_changed_positions(idx_1: int, idx_2: int) -> tuple:
+    return idx_1, idx_2
+
+
+def two_opt_changed_positions(start: int, end: int) -> range:
+    return range(start, end + 1)
+
+
+def or_opt_changed_positions(start: int, segment_len: int, insert_after: int) -> range:
+    return range(min(start, insert_after), max(start + segment_len - 1, insert_after) + 1)
+
+
+# functions generating moves from candidate lists and positions changed by each type of move
+DICT_CANDIDATE_MOVES = {'swap': (propose_candidate_swap, swap_changed_positions),
+                        '2-opt': (propose_candidate_two_opt, two_opt_changed_positions),
+                        'or-opt': (propose_candidate_or_opt, or_opt_changed_positions)}
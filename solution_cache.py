@@ -0,0 +1,206 @@
+import hashlib
+import os
+from collections import OrderedDict
+import numpy as np
+from scipy.spatial import cKDTree
+from typing import Callable, Tuple
+
+
+class SolutionCache:
+    """
+    Cache of the best paths found for instances, keyed by fingerprint of the coordinates of the cities.
+    Exact repeat of the instance returns cached path without running the algorithm, for similar instance
+    (cities moved a little, some cities added or removed) cached path is adapted to its cities and used
+    to seed the algorithm. The least recently used instances are removed when capacity is exceeded.
+
+    :param capacity: maximum number of kept instances
+    :param cache_dir: directory where instances are also saved as .npz files, so they are kept between runs
+    (cache is kept only in memory if not given)
+    :param tolerance: city is matched with the nearest city of cached instance if they are closer than
+    tolerance times the size of the instance
+    :param min_similarity: minimum share of cities of both instances which have to be matched to use cached path
+    """
+    def __init__(self, capacity: int = 128, cache_dir: str = None, tolerance: float = 1e-3,
+                 min_similarity: float = 0.9):
+        self.capacity = capacity
+        self.cache_dir = cache_dir
+        self.tolerance = tolerance
+        self.min_similarity = min_similarity
+        self.dict_entries = OrderedDict()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.load_entries()
+
+    def get(self, cities: np.array) -> Tuple[float, list]:
+        """
+        Find path of exactly the same instance
+
+        :param cities: 2D numpy array of cities
+        :return: best score and best path (with return to the starting city) or None if instance is not cached
+        """
+        key = fingerprint(cities)
+        entry = self.dict_entries.get(key)
+        if entry is None or not np.array_equal(entry['cities'], cities):
+            return None
+        self.touch(key)
+        # copy is returned, so changes made by the caller do not corrupt the cache
+        return entry['score'], list(entry['path'])
+
+    def put(self, cities: np.array, score: float, path: list) -> None:
+        """
+        Remember path of the instance (path is replaced only by better one)
+
+        :param cities: 2D numpy array of cities
+        :param score: length of the path
+        :param path: path with or without return to the starting city
+        """
+        key = fingerprint(cities)
+        entry = self.dict_entries.get(key)
+        if entry is None or score < entry['score']:
+            path = [int(city) for city in path]
+            if path[0] != path[-1]:
+                path.append(path[0])
+            entry = {'cities': np.array(cities, dtype=np.float64), 'score': float(score), 'path': path}
+            self.dict_entries[key] = entry
+            if self.cache_dir is not None:
+                np.savez(self.entry_file(key), cities=entry['cities'], score=entry['score'],
+                         path=np.array(entry['path']))
+        self.touch(key)
+        while len(self.dict_entries) > self.capacity:
+            self.remove(next(iter(self.dict_entries)))
+
+    def warm_start(self, cities: np.array) -> list:
+        """
+        Find cached instance similar to the given one and adapt its path to the given cities
+
+        :param cities: 2D numpy array of cities
+        :return: path (with return to the starting city) visiting each city or None if there is no similar instance
+        """
+        cities = np.asarray(cities, dtype=np.float64)
+        array_min, array_max = cities.min(axis=0), cities.max(axis=0)
+        max_shift = self.tolerance * max(float(np.max(array_max - array_min)), 1e-12)
+        tree = None
+        best_similarity, best_key = self.min_similarity, None
+        # the most recently used instances are checked first
+        for key, entry in reversed(self.dict_entries.items()):
+            num_of_cached = entry['cities'].shape[0]
+            # instances of very different size or placement can not be similar
+            if min(num_of_cached, cities.shape[0]) < self.min_similarity * max(num_of_cached, cities.shape[0]):
+                continue
+            if np.any(np.abs(entry['cities'].min(axis=0) - array_min) > 0.1 * (array_max - array_min) + max_shift):
+                continue
+            if tree is None:
+                tree = cKDTree(cities)
+            similarity = instances_similarity(entry['cities'], tree, max_shift)
+            if similarity >= best_similarity:
+                best_similarity, best_key = similarity, key
+        if best_key is None:
+            return None
+        self.touch(best_key)
+        entry = self.dict_entries[best_key]
+        return adapt_path(entry['cities'], entry['path'], cities, tree)
+
+    def solve(self, algorithm: Callable, cities: np.array, *args, **kwargs) -> Tuple[float, list]:
+        """
+        Solve the instance using cache: exact repeat returns cached result, similar instance seeds
+        the algorithm with adapted path (given as initial_path) and the result is cached
+
+        :param algorithm: algorithm taking initial_path argument (ant_system, genetic_algorithm
+        or simulated_annealing)
+        :param cities: 2D numpy array of cities
+        :param args: other arguments of the algorithm
+        :param kwargs: other keyword arguments of the algorithm
+        :return: best score and best path
+        """
+        result = self.get(cities)
+        if result is not None:
+            self.hits += 1
+            return result
+        initial_path = self.warm_start(cities)
+        if initial_path is not None:
+            self.similar_hits += 1
+            kwargs = {**kwargs, 'initial_path': initial_path}
+        else:
+            self.misses += 1
+        best_score, best_path = algorithm(cities, *args, **kwargs)
+        self.put(cities, best_score, best_path)
+        return best_score, best_path
+
+    def touch(self, key: str) -> None:
+        # mark instance as the most recently used
+        self.dict_entries.move_to_end(key)
+        if self.cache_dir is not None and os.path.exists(self.entry_file(key)):
+            os.utime(self.entry_file(key))
+
+    def remove(self, key: str) -> None:
+        del self.dict_entries[key]
+        if self.cache_dir is not None and os.path.exists(self.entry_file(key)):
+            os.remove(self.entry_file(key))
+
+    def entry_file(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.npz')
+
+    def load_entries(self) -> None:
+        # instances saved on disk are loaded from the least recently used, so the order of use is kept
+        list_files = sorted((file for file in os.listdir(self.cache_dir) if file.endswith('.npz')),
+                            key=lambda file: os.path.getmtime(os.path.join(self.cache_dir, file)))
+        for file in list_files:
+            with np.load(os.path.join(self.cache_dir, file)) as data:
+                self.dict_entries[file[:-4]] = {'cities': data['cities'], 'score': float(data['score']),
+                                                'path': data['path'].tolist()}
+        while len(self.dict_entries) > self.capacity:
+            self.remove(next(iter(self.dict_entries)))
+
+
+def fingerprint(cities: np.array) -> str:
+    # hash of the number of cities and their coordinates
+    array_cities = np.ascontiguousarray(cities, dtype=np.float64)
+    digest = hashlib.sha1(str(array_cities.shape).encode())
+    digest.update(array_cities.tobytes())
+    return digest.hexdigest()
+
+
+def instances_similarity(cached_cities: np.array, tree: cKDTree, max_shift: float) -> float:
+    # share of cities of the smaller instance, which were matched with different cities of the other instance
+    array_dist, array_nearest = tree.query(cached_cities, distance_upper_bound=max_shift)
+    num_of_matched = np.unique(array_nearest[np.isfinite(array_dist)]).shape[0]
+    return num_of_matched / max(cached_cities.shape[0], tree.n)
+
+
+def adapt_path(cached_cities: np.array, cached_path: list, cities: np.array, tree: cKDTree = None) -> list:
+    """
+    Transfer path of the cached instance to similar instance: each city of the cached path is replaced by
+    the nearest city of the new instance and cities left out are inserted after their nearest visited city
+
+    :param cached_cities: 2D numpy array of cities of the cached instance
+    :param cached_path: path of the cached instance (with return to the starting city)
+    :param cities: 2D numpy array of cities of the new instance
+    :param tree: KD-tree of the new cities (built if not given)
+    :return: path (with return to the starting city) visiting each city of the new instance once
+    """
+    if tree is None:
+        tree = cKDTree(cities)
+    num_of_cities = cities.shape[0]
+    _, array_nearest = tree.query(cached_cities[np.asarray(cached_path[:-1])])
+    # the first occurrence of each city keeps its place in the path
+    list_order = list(dict.fromkeys(array_nearest.tolist()))
+    array_visited = np.zeros(num_of_cities, dtype=bool)
+    array_visited[list_order] = True
+
+    array_left = np.flatnonzero(~array_visited)
+    dict_inserted = {}
+    if array_left.shape[0] > 0:
+        array_visited_cities = np.flatnonzero(array_visited)
+        _, array_anchor_idx = cKDTree(cities[array_visited_cities]).query(cities[array_left])
+        for city, anchor in zip(array_left.tolist(), array_visited_cities[array_anchor_idx].tolist()):
+            dict_inserted.setdefault(anchor, []).append(city)
+
+    path = []
+    for city in list_order:
+        path.append(city)
+        path.extend(dict_inserted.get(city, []))
+    path.append(path[0])
+    return path
@@ -0,0 +1,93 @@
+import itertools
+import time
+
+
+class Termination:
+    """
+    Stopping criteria shared by all algorithms, the algorithm stops when any of the given criteria is met.
+    Clock is read only every few iterations: interval between readings grows until at least
+    min_check_interval seconds pass between them, so cheap iterations (like moves of simulated annealing)
+    do not pay for reading the clock each time.
+
+    :param time_limit: maximum working time in seconds
+    :param max_evaluations: maximum number of evaluated paths (or moves)
+    :param target_score: stop when path of that or smaller length was found
+    :param max_no_improvement: stop after that number of iterations without improvement of the best score
+    :param min_check_interval: minimum time in seconds between readings of the clock
+    """
+    def __init__(self,
+                 time_limit: float = None,
+                 max_evaluations: int = None,
+                 target_score: float = None,
+                 max_no_improvement: int = None,
+                 min_check_interval: float = 0.01):
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.target_score = target_score
+        self.max_no_improvement = max_no_improvement
+        self.min_check_interval = min_check_interval
+        self.start()
+
+    def start(self) -> None:
+        # reset state, has to be called at the beginning of each run
+        self.start_time = time.perf_counter()
+        self.last_check_time = self.start_time
+        self.check_every = 1
+        self.iterations_to_check = 1
+        self.iterations = 0
+        self.evaluations = 0
+        self.no_improvement = 0
+        self.best_score = float('inf')
+        self.reason = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    def out_of_time(self) -> bool:
+        # clock is read directly, so the result does not depend on the interval between checks
+        return self.reason == 'time_limit' or \
+            (self.time_limit is not None and self.elapsed() >= self.time_limit)
+
+    def update(self, best_score: float, num_of_evaluations: int = 1) -> bool:
+        """
+        Register one iteration of the algorithm
+
+        :param best_score: best score found so far
+        :param num_of_evaluations: number of paths (or moves) evaluated in the iteration
+        :return: True if the algorithm should stop
+        """
+        self.iterations += 1
+        self.evaluations += num_of_evaluations
+        if best_score < self.best_score:
+            self.best_score = best_score
+            self.no_improvement = 0
+        else:
+            self.no_improvement += 1
+
+        if self.target_score is not None and best_score <= self.target_score:
+            self.reason = 'target_score'
+        elif self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            self.reason = 'max_evaluations'
+        elif self.max_no_improvement is not None and self.no_improvement >= self.max_no_improvement:
+            self.reason = 'max_no_improvement'
+        elif self.time_limit is not None:
+            self.iterations_to_check -= 1
+            if self.iterations_to_check <= 0:
+                now = time.perf_counter()
+                if now - self.start_time >= self.time_limit:
+                    self.reason = 'time_limit'
+                # read the clock less often if iterations are fast
+                if now - self.last_check_time < self.min_check_interval:
+                    self.check_every *= 2
+                self.last_check_time = now
+                self.iterations_to_check = self.check_every
+        return self.reason is not None
+
+
+def iteration_range(num_of_iter: int, termination: Termination = None):
+    # without limit of iterations algorithm works until termination criteria are met
+    if num_of_iter is None:
+        if termination is None:
+            raise ValueError('Number of iterations or termination criteria have to be given')
+        return itertools.count()
+    return range(num_of_iter)